@@ -1,12 +1,17 @@
 # import pymongo
+import threading
+import time
 from contextlib import contextmanager
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from src.config import Config
 from sqlalchemy.orm import scoped_session
 from contextlib import contextmanager
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from urllib.parse import quote_plus
 
 database = Config.MYSQL_DATABASE
@@ -17,9 +22,128 @@ host = Config.MYSQL_HOST_NAME
 
 # url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
 url = "mysql+pymysql://root:@host.docker.internal:3306/brmkjimy_survey"
-engine = create_engine(
-    url
-)
+
+# Pool defaults per process role. The API serves many short requests
+# concurrently. A worker task keeps its session for the whole crew run, so a
+# threads pool agent worker needs a connection per Celery thread.
+POOL_SETTINGS = {
+    "api": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "connect_timeout": 10,
+    },
+    "worker": {
+        "pool_size": Config.CELERY_AGENT_CONCURRENCY,
+        "max_overflow": 4,
+        "pool_timeout": 60,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "connect_timeout": 10,
+    },
+}
+
+
+def get_pool_settings(role: str = Config.DB_ROLE) -> dict:
+    """Pool settings for role, with DB_* environment overrides applied."""
+    if role not in POOL_SETTINGS:
+        raise ValueError(
+            f"Unsupported DB_ROLE: {role}. Supported roles: {set(POOL_SETTINGS)}"
+        )
+
+    settings = dict(POOL_SETTINGS[role])
+    overrides = {
+        "pool_size": (Config.DB_POOL_SIZE, int),
+        "max_overflow": (Config.DB_MAX_OVERFLOW, int),
+        "pool_timeout": (Config.DB_POOL_TIMEOUT, float),
+        "pool_recycle": (Config.DB_POOL_RECYCLE, int),
+        "pool_pre_ping": (Config.DB_POOL_PRE_PING, lambda v: v.lower() == "true"),
+        "connect_timeout": (Config.DB_CONNECT_TIMEOUT, int),
+    }
+    for key, (value, cast) in overrides.items():
+        if value:
+            settings[key] = cast(value)
+
+    return settings
+
+
+class PoolMetrics:
+    """Counters of connection checkouts, updated by InstrumentedQueuePool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def create_db_engine(role: str = Config.DB_ROLE):
+    settings = get_pool_settings(role)
+    connect_timeout = settings.pop("connect_timeout")
+
+    return create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        connect_args={"connect_timeout": connect_timeout},
+        **settings,
+    )
+
+
+engine = create_db_engine()
+
+
+def get_pool_metrics() -> dict:
+    """Current pool usage and checkout wait statistics of the engine."""
+    pool = engine.pool
+    metrics = pool.metrics
+    return {
+        "role": Config.DB_ROLE,
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "checkouts": metrics.checkouts,
+        "checkout_timeouts": metrics.timeouts,
+        "avg_checkout_wait_ms": (
+            metrics.total_wait / metrics.checkouts * 1000 if metrics.checkouts else 0.0
+        ),
+        "max_checkout_wait_ms": metrics.max_wait * 1000,
+    }
 
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
@@ -58,6 +182,52 @@ def get_db_session_celery() -> Generator:
         # ScopedSession.remove()
 
 
+_async_engine = None
+_async_session_factory = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine():
+    """
+    Async engine (aiomysql) over the same database, created on first use so
+    processes that never serve async requests (Celery workers) skip it.
+    """
+    global _async_engine, _async_session_factory
+
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                settings = get_pool_settings()
+                connect_timeout = settings.pop("connect_timeout")
+                _async_engine = create_async_engine(
+                    make_url(url).set(drivername="mysql+aiomysql"),
+                    connect_args={"connect_timeout": connect_timeout},
+                    **settings,
+                )
+                _async_session_factory = async_sessionmaker(
+                    bind=_async_engine,
+                    autocommit=False,
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    get_async_engine()
+    return _async_session_factory
+
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_session_factory()() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+
 db = SessionLocal()
 
 # try:
@@ -3,6 +3,7 @@ from fastapi import HTTPException
 from src.agent.models import Agent
 from sqlalchemy.orm import Session
 from src.utils.utils import get_uuid
+from src.utils.loaders import is_supported_file_type, supported_file_types
 from src.agent.task import embedding_docs
 
 
@@ -25,13 +26,18 @@ class AgentController:
 
         agent = AgentController.get_agents_by_id_ctrl(db=db, id=payload.get("id"))
 
-        # Generate new namespace for vector store
-        namespace = get_uuid()
-        url_file_type = str(agent.own_data).rsplit(".")[-1]
-        if url_file_type not in Config.SUPPORTED_FILE_TYPES:
-            raise ValueError(
-                f"Unsupported file type. Supported types: {Config.SUPPORTED_FILE_TYPES}"
+        # Reject files no loader can ingest before any task is queued
+        url_file_type = str(agent.own_data).rsplit(".")[-1].lower()
+        if not agent.own_data or not is_supported_file_type(url_file_type):
+            raise HTTPException(
+                detail=f"Unsupported file type. Supported types: {supported_file_types()}",
+                status_code=400,
             )
+
+        # Re-index into the existing namespace when incremental re-indexing
+        # is enabled, otherwise generate a new namespace for vector store
+        incremental = Config.INCREMENTAL_REINDEX and bool(agent.vector_id)
+        namespace = agent.vector_id if incremental else get_uuid()
         # Schedule document embedding task
         embedding_docs.delay(
             api_key=Config.PINECONE_API_KEY,
@@ -39,6 +45,7 @@ class AgentController:
             namespace=namespace,
             url=agent.own_data,
             url_file_type=url_file_type,
+            incremental=incremental,
         )
         agent.vector_id = namespace
 
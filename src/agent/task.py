@@ -3,8 +3,8 @@ from src.utils.logger import logger_set
 from src.utils.pinecone import PineConeConfig
 
 
-@celery_app.task()
-def embedding_docs(api_key: str, index_name:str, namespace:str, url: str, url_file_type:str):
+@celery_app.task(bind=True)
+def embedding_docs(self, api_key: str, index_name:str, namespace:str, url: str, url_file_type:str, incremental: bool = False):
     """
     Embeds documents into a Pinecone index.
 
@@ -14,6 +14,8 @@ def embedding_docs(api_key: str, index_name:str, namespace:str, url: str, url_fi
         namespace (str): The namespace for organizing the embedded documents.
         file_path (str): The path to the file containing the documents to embed.
         file_type (str): The type of the file (e.g., 'txt', 'pdf').
+        incremental (bool): Re-index into an existing namespace, embedding
+            only new or changed chunks and deleting removed ones.
 
     Returns:
         str: A confirmation message indicating successful embedding.
@@ -21,6 +23,8 @@ def embedding_docs(api_key: str, index_name:str, namespace:str, url: str, url_fi
     Notes:
         This function uses the PineConeConfig to configure the embedding process
         and is designed to be run as a Celery task for asynchronous processing.
+        While running, the task state is PROGRESS with the number of chunks
+        indexed so far in its meta.
     """
     try:
         pc = PineConeConfig(
@@ -30,10 +34,21 @@ def embedding_docs(api_key: str, index_name:str, namespace:str, url: str, url_fi
             url="/app/external_upload/"+url.rsplit("/")[-1],
             url_file_type=url_file_type,
         )
-        pc.add_documents()
-        logger_set.info(
-            f"Document embedded successfully. Namespace (vector_id): {namespace}"
+        progress_callback = lambda indexed: self.update_state(
+            state="PROGRESS",
+            meta={"namespace": namespace, "chunks_indexed": indexed},
         )
+        if incremental:
+            stats = pc.sync_documents(progress_callback=progress_callback)
+            logger_set.info(
+                f"Document re-indexed successfully. Namespace (vector_id): {namespace}, "
+                f"Added: {stats['added']}, Removed: {stats['removed']}, Unchanged: {stats['unchanged']}"
+            )
+        else:
+            chunks = pc.add_documents(progress_callback=progress_callback)
+            logger_set.info(
+                f"Document embedded successfully. Namespace (vector_id): {namespace}, Chunks: {chunks}"
+            )
         return f"Document embedded successfully. Namespace: {namespace}"
     except Exception as e:
         logger_set.info(
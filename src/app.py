@@ -2,6 +2,7 @@ import os
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from database import get_pool_metrics
 from src.config import Config
 from src.tool.apis import router as tools_router
 from src.agent.apis import router as agents_router
@@ -40,6 +41,11 @@ def root():
     return JSONResponse(content={"status": "Healthy"}, status_code=200)
 
 
+@app.get("/health/db")
+def db_pool_health():
+    return JSONResponse(content={"pool": get_pool_metrics()}, status_code=200)
+
+
 app.include_router(tools_router, prefix="/api/v1/tools", tags=["tools"])
 app.include_router(agents_router, prefix="/api/v1/agent", tags=["agents"])
 app.include_router(tasks_router, prefix="/api/v1/tasks", tags=["tasks"])
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init
 from src.config import Config
 
 try:
@@ -11,9 +12,19 @@ try:
 except Exception as e:
     print(str(e))
 
+celery_app.config_from_object("src.celeryconfig")
+
 # # Configure Celery to not ignore results
 # celery_app.conf.update(
 #     task_track_started=True,
 #     result_expires=None,  # Results won't expire
 #     task_ignore_result=False,  # Don't ignore results
 # )
+
+
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    """Forked worker processes must not reuse connections of the parent."""
+    from database import engine
+
+    engine.dispose(close=False)
@@ -0,0 +1,71 @@
+"""
+Celery settings, loaded by src.celery with config_from_object.
+
+Work is split over three queues so a slow document never holds up LLM tasks:
+"ingestion" (document embedding), "agents" (crew runs) and "summaries". Every
+queue is consumed by a worker profile (see WORKER_PROFILES) with its own pool
+and concurrency, started with `python -m src.worker <profile>`.
+"""
+from kombu import Queue
+from src.config import Config
+
+INGESTION_QUEUE = "ingestion"
+AGENT_QUEUE = "agents"
+SUMMARY_QUEUE = "summaries"
+
+task_queues = (
+    Queue(INGESTION_QUEUE),
+    Queue(AGENT_QUEUE),
+    Queue(SUMMARY_QUEUE),
+)
+task_default_queue = AGENT_QUEUE
+task_routes = {
+    "src.agent.task.embedding_docs": {"queue": INGESTION_QUEUE},
+    "src.task.task.task_creation_celery": {"queue": AGENT_QUEUE},
+    "src.task.task.reassign_task_ctrl": {"queue": AGENT_QUEUE},
+    "src.task.task.run_workflow_task": {"queue": AGENT_QUEUE},
+    "*.summar*": {"queue": SUMMARY_QUEUE},
+}
+
+# A worker reserves only the task it is about to run, so queued tasks stay
+# available to idle workers instead of waiting behind a long running one
+worker_prefetch_multiplier = Config.CELERY_PREFETCH_MULTIPLIER
+
+# Tasks are acknowledged once they finished, a task of a worker that died is
+# delivered again. The Redis visibility timeout must exceed the longest task.
+task_acks_late = Config.CELERY_ACKS_LATE
+task_reject_on_worker_lost = Config.CELERY_ACKS_LATE
+broker_transport_options = {"visibility_timeout": Config.CELERY_VISIBILITY_TIMEOUT}
+
+# Recycle prefork children to bound the memory held by parsers and models
+worker_max_tasks_per_child = Config.CELERY_MAX_TASKS_PER_CHILD
+
+task_track_started = True
+worker_send_task_events = True
+
+# Pool, concurrency and queues of every worker profile. The pool is "prefork",
+# "threads", "gevent" (needs gevent installed) or "solo".
+WORKER_PROFILES = {
+    "ingestion": {
+        "queues": [INGESTION_QUEUE],
+        "pool": Config.CELERY_INGESTION_POOL,
+        "concurrency": Config.CELERY_INGESTION_CONCURRENCY,
+    },
+    # Also drains summaries until a dedicated summaries worker is started
+    "agents": {
+        "queues": [AGENT_QUEUE, SUMMARY_QUEUE],
+        "pool": Config.CELERY_AGENT_POOL,
+        "concurrency": Config.CELERY_AGENT_CONCURRENCY,
+    },
+    "summaries": {
+        "queues": [SUMMARY_QUEUE],
+        "pool": Config.CELERY_SUMMARY_POOL,
+        "concurrency": Config.CELERY_SUMMARY_CONCURRENCY,
+    },
+    # Everything in one worker, for development
+    "all": {
+        "queues": [INGESTION_QUEUE, AGENT_QUEUE, SUMMARY_QUEUE],
+        "pool": Config.CELERY_AGENT_POOL,
+        "concurrency": Config.CELERY_AGENT_CONCURRENCY,
+    },
+}
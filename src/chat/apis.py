@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException, Request
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
+from database import get_async_db_session, get_async_session_factory
+from src.chat.controllers import ChatController
 from src.config import Config
 from src.utils.logger import logger_set
+from src.utils.utils import get_uuid
 import openai
 
 
@@ -15,34 +23,118 @@ router = APIRouter()
 # Set the OpenAI API key
 # openai.api_key = OPENAI_API_KEY
 
-client = openai.OpenAI(
+client = openai.AsyncOpenAI(
     api_key=Config.OPENAI_API_KEY,  # This is the default and can be omitted
 )
 
 
+# Turns being stored, referenced until they finish
+_pending_turns: set[asyncio.Task] = set()
+
+
+async def save_turn(chat_id: str, context: dict, query: str, ai_response: str) -> None:
+    # The request session may already be closed once streaming starts
+    async with get_async_session_factory()() as db:
+        await ChatController.add_turn(db, client, chat_id, context, query, ai_response)
+
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Format data as one server-sent event."""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+async def stream_chat_completion(
+    chat_id: str, query: str, context: dict, messages: list[dict]
+):
+    """
+    Forward completion tokens as "token" events as soon as OpenAI sends them,
+    followed by a "done" event carrying the full response. The turn is stored
+    before "done" in a shielded task, so a client that closes the stream on
+    "done" or disconnects does not lose it.
+    """
+    chunks = []
+    try:
+        stream = await client.chat.completions.create(
+            model=Config.CHAT_MODEL, messages=messages, stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                chunks.append(delta)
+                yield sse_event({"token": delta}, event="token")
+
+        ai_response = "".join(chunks)
+        logger_set.info(f"AI response: {ai_response}")
+
+        save = asyncio.ensure_future(save_turn(chat_id, context, query, ai_response))
+        _pending_turns.add(save)
+        save.add_done_callback(_pending_turns.discard)
+        await asyncio.shield(save)
+
+        yield sse_event(
+            {"chat_id": chat_id, "query": query, "response": ai_response},
+            event="done",
+        )
+    except openai.OpenAIError as e:
+        logger_set.error(f"OpenAI API error: {e}")
+        yield sse_event({"error": "Error communicating with OpenAI API."}, event="error")
+    except Exception as e:
+        logger_set.error(f"Unexpected error: {e}")
+        yield sse_event({"error": "An unexpected error occurred."}, event="error")
+
+
 @router.post("")
-async def ai_chat(request: Request, query: str, history: list[dict] = []):
+async def ai_chat(
+    request: Request,
+    query: str,
+    chat_id: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db_session),
+):
     """
     Endpoint to interact with the ChatGPT model.
 
+    The conversation is kept server side: pass the chat_id returned by the
+    first call to continue it. Only a token bounded context (a summary of
+    older turns plus the latest turns) is sent to the model.
+
     Args:
         request (Request): The HTTP request object.
         query (str): The user's query to ChatGPT.
-        history (list[dict]): The conversation history to provide context for the chat.
+        chat_id (str, optional): The chat session to continue, a new one is started if omitted.
+        stream (bool): Stream the response as server-sent events instead.
 
     Returns:
-        dict: The AI-generated response.
+        dict: The chat id, query and AI-generated response, or a
+        text/event-stream of "token" events followed by a "done" event with
+        the same payload.
     """
     try:
         # Log the incoming query
-        logger_set.info(f"Received query: {query}")
+        logger_set.info(f"Received query: {query}, Chat id: {chat_id}")
+
+        if chat_id:
+            context = await ChatController.get_context(db, client, chat_id)
+        else:
+            chat_id = get_uuid()
+            context = {"summary": "", "turns": []}
 
-        # Prepare the messages with conversation history
-        messages = [{"role": "system", "content": "You are a helpful assistant."}] + history + [{"role": "user", "content": query}]
+        # Prepare the messages with the compacted conversation context
+        messages = ChatController.build_messages(context, query)
+
+        if stream:
+            return StreamingResponse(
+                stream_chat_completion(chat_id, query, context, messages),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
 
         # Call OpenAI's ChatGPT API
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # Specify the desired model
+        response = await client.chat.completions.create(
+            model=Config.CHAT_MODEL,  # Specify the desired model
             messages=messages
         )
 
@@ -50,8 +142,10 @@ async def ai_chat(request: Request, query: str, history: list[dict] = []):
         ai_response = response.choices[0].message.content
         logger_set.info(f"AI response: {ai_response}")
 
+        await ChatController.add_turn(db, client, chat_id, context, query, ai_response)
+
         # Return the response to the user
-        return {"query": query, "response": ai_response, "history": history + [{"role": "user", "content": query}, {"role": "assistant", "content": ai_response}]}
+        return {"chat_id": chat_id, "query": query, "response": ai_response}
 
     except openai.OpenAIError as e:
         # Log the error
@@ -66,3 +160,34 @@ async def ai_chat(request: Request, query: str, history: list[dict] = []):
 
         # Raise an HTTP exception with a generic error message
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
+
+
+@router.get("/{chat_id}")
+async def get_chat_history(
+    chat_id: str,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    """
+    Return the persisted turns of a chat session, oldest first.
+
+    Args:
+        chat_id (str): The chat session.
+        limit (int, optional): Only return the latest limit turns.
+    """
+    try:
+        chats = await ChatController.get_chat_history(db, chat_id, limit)
+        return {
+            "chat_id": chat_id,
+            "history": [
+                {
+                    "query": chat.user_message,
+                    "response": chat.bot_response,
+                    "created_at": str(chat.created_at),
+                }
+                for chat in chats
+            ],
+        }
+    except Exception as e:
+        logger_set.error(f"Unexpected error: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred.")
@@ -1,3 +1,187 @@
+import json
+from datetime import datetime
+from typing import Optional
+import openai
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.chat.models import ChatAI
+from src.config import Config
+from src.utils.cache import get_async_redis
+from src.utils.logger import logger_set
+from src.utils.tokens import count_tokens
+
+
 class PreprocessText:
     def __init__(self, corpus: list[str]):
         self.corpus = corpus
+
+
+class ChatController:
+    """
+    Server side chat sessions.
+
+    Every turn is persisted as a ChatAI row. The context sent to the model
+    (a running summary plus the most recent turns) is kept in Redis and
+    trimmed to Config.CHAT_HISTORY_TOKEN_BUDGET, older turns are folded into
+    the summary instead of being resent.
+    """
+
+    SYSTEM_PROMPT = "You are a helpful assistant."
+
+    @staticmethod
+    def _cache_key(chat_id: str) -> str:
+        return f"chat:context:{chat_id}"
+
+    @staticmethod
+    async def get_context(
+        db: AsyncSession, client: openai.AsyncOpenAI, chat_id: str
+    ) -> dict:
+        """Return {"summary": str, "turns": [{"user", "assistant"}]} of chat_id."""
+        try:
+            cached = await get_async_redis().get(ChatController._cache_key(chat_id))
+            if cached:
+                return json.loads(cached)
+        except Exception as e:
+            logger_set.error(f"Chat context cache read failed : {e}")
+
+        # Cold cache: rebuild from the most recent persisted turns
+        result = await db.execute(
+            select(ChatAI)
+            .filter(ChatAI.chat_id == chat_id)
+            .order_by(ChatAI.id.desc())
+            .limit(Config.CHAT_HISTORY_MAX_TURNS)
+        )
+        turns = [
+            {"user": chat.user_message, "assistant": chat.bot_response}
+            for chat in reversed(result.scalars().all())
+        ]
+        context = await ChatController.compact(client, {"summary": "", "turns": turns})
+        await ChatController._set_context(chat_id, context)
+
+        return context
+
+    @staticmethod
+    async def _set_context(chat_id: str, context: dict) -> None:
+        try:
+            await get_async_redis().set(
+                ChatController._cache_key(chat_id),
+                json.dumps(context),
+                ex=Config.CHAT_SESSION_CACHE_TTL,
+            )
+        except Exception as e:
+            logger_set.error(f"Chat context cache write failed : {e}")
+
+    @staticmethod
+    def _turn_tokens(turn: dict) -> int:
+        return count_tokens(turn["user"], Config.CHAT_MODEL) + count_tokens(
+            turn["assistant"], Config.CHAT_MODEL
+        )
+
+    @staticmethod
+    async def compact(client: openai.AsyncOpenAI, context: dict) -> dict:
+        """
+        Fold the oldest turns into the summary until summary and turns fit the
+        token budget. The latest turn is always kept verbatim.
+        """
+        budget = Config.CHAT_HISTORY_TOKEN_BUDGET
+        turns = context["turns"]
+        used = count_tokens(context["summary"], Config.CHAT_MODEL) + sum(
+            ChatController._turn_tokens(turn) for turn in turns
+        )
+        if used <= budget:
+            return context
+
+        folded = []
+        while len(turns) > 1 and used > budget - Config.CHAT_SUMMARY_MAX_TOKENS:
+            turn = turns.pop(0)
+            used -= ChatController._turn_tokens(turn)
+            folded.append(turn)
+
+        if folded:
+            context["summary"] = await ChatController.summarize(
+                client, context["summary"], folded
+            )
+
+        return {"summary": context["summary"], "turns": turns}
+
+    @staticmethod
+    async def summarize(
+        client: openai.AsyncOpenAI, summary: str, turns: list[dict]
+    ) -> str:
+        conversation = "\n".join(
+            f"User: {turn['user']}\nAssistant: {turn['assistant']}" for turn in turns
+        )
+        response = await client.chat.completions.create(
+            model=Config.CHAT_MODEL,
+            max_tokens=Config.CHAT_SUMMARY_MAX_TOKENS,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Condense the conversation into a short summary that keeps every fact, name and decision needed to continue it.",
+                },
+                {
+                    "role": "user",
+                    "content": f"Summary so far: {summary or 'None'}\n\nNew conversation:\n{conversation}",
+                },
+            ],
+        )
+
+        return response.choices[0].message.content
+
+    @staticmethod
+    def build_messages(context: dict, query: str) -> list[dict]:
+        messages = [{"role": "system", "content": ChatController.SYSTEM_PROMPT}]
+        if context["summary"]:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation: {context['summary']}",
+                }
+            )
+        for turn in context["turns"]:
+            messages.append({"role": "user", "content": turn["user"]})
+            messages.append({"role": "assistant", "content": turn["assistant"]})
+        messages.append({"role": "user", "content": query})
+
+        return messages
+
+    @staticmethod
+    async def add_turn(
+        db: AsyncSession,
+        client: openai.AsyncOpenAI,
+        chat_id: str,
+        context: dict,
+        query: str,
+        response: str,
+    ) -> dict:
+        """Persist the turn and store the compacted context for the next one."""
+        now = datetime.now()
+        db.add(
+            ChatAI(
+                chat_id=chat_id,
+                user_message=query,
+                bot_response=response,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        await db.commit()
+
+        context["turns"].append({"user": query, "assistant": response})
+        context = await ChatController.compact(client, context)
+        await ChatController._set_context(chat_id, context)
+
+        return context
+
+    @staticmethod
+    async def get_chat_history(
+        db: AsyncSession, chat_id: str, limit: Optional[int] = None
+    ) -> list[ChatAI]:
+        query = (
+            select(ChatAI).filter(ChatAI.chat_id == chat_id).order_by(ChatAI.id.desc())
+        )
+        if limit:
+            query = query.limit(limit)
+        result = await db.execute(query)
+
+        return list(reversed(result.scalars().all()))
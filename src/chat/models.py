@@ -29,18 +29,6 @@ class ChatWithAI(Base):
     updated_at = Column(DateTime, nullable=True)
 
 
-class ChatAI(Base):
-    __tablename__ = "chatais"
-
-    id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
-
-    chat_id = Column(Text(collation="utf8mb4_unicode_ci"), nullable=False)
-    user_message = Column(Text(collation="utf8mb4_unicode_ci"), nullable=False)
-    bot_response = Column(Text(collation="utf8mb4_unicode_ci"), nullable=False)
-    created_at = Column(DateTime, nullable=True)
-    updated_at = Column(DateTime, nullable=True)
-
-
 class Chat(Base):
     __tablename__ = "chats"
 
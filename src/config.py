@@ -15,6 +15,44 @@ class Config:
     DATABSE_URL = os.getenv("DATABASE_URL")
     REDIS_URL = os.getenv("REDIS_URL")
     PINECONE_INDEX_NAME = "colabi"
+    # Set once the index is provisioned to skip the list_indexes call entirely
+    PINECONE_SKIP_INDEX_CHECK = os.getenv("PINECONE_SKIP_INDEX_CHECK", "false").lower() == "true"
+    # Similarity search result cache: "local", "redis" or "none"
+    RETRIEVAL_CACHE_BACKEND = os.getenv("RETRIEVAL_CACHE_BACKEND", "local")
+    RETRIEVAL_CACHE_TTL = int(os.getenv("RETRIEVAL_CACHE_TTL", 3600))
+    RETRIEVAL_CACHE_MAXSIZE = int(os.getenv("RETRIEVAL_CACHE_MAXSIZE", 1024))
+    # Retrieval mode, "vector" or "hybrid" (vector candidates reranked with BM25)
+    RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")
+    RETRIEVAL_FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", 20))
+    RETRIEVAL_HYBRID_ALPHA = float(os.getenv("RETRIEVAL_HYBRID_ALPHA", 0.5))
+    RETRIEVAL_BM25_K1 = float(os.getenv("RETRIEVAL_BM25_K1", 1.5))
+    RETRIEVAL_BM25_B = float(os.getenv("RETRIEVAL_BM25_B", 0.75))
+    RETRIEVAL_MMR = os.getenv("RETRIEVAL_MMR", "false").lower() == "true"
+    RETRIEVAL_MMR_LAMBDA = float(os.getenv("RETRIEVAL_MMR_LAMBDA", 0.5))
+    # Embedding cache: local SQLite file plus an optional shared Redis tier
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "cache/embeddings.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 200000))
+    EMBEDDING_CACHE_REDIS = os.getenv("EMBEDDING_CACHE_REDIS", "false").lower() == "true"
+    EMBEDDING_CACHE_REDIS_TTL = int(os.getenv("EMBEDDING_CACHE_REDIS_TTL", 7 * 24 * 3600))
+    # LLM response cache, used by the comma separated agent roles ("*" for all)
+    LLM_CACHE_ROLES = os.getenv(
+        "LLM_CACHE_ROLES", "Comment agent,Identifier retriever for Zapier actions"
+    )
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/llm.sqlite3")
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50000))
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+    LLM_CACHE_REDIS = os.getenv("LLM_CACHE_REDIS", "false").lower() == "true"
+    # Document ingestion: chunks per embed/upsert batch and batches in flight
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 100))
+    INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", 4))
+    # Vector backend: "pinecone", "local" or "auto" (local copy of namespaces
+    # of at most LOCAL_INDEX_MAX_CHUNKS chunks, searched without Pinecone)
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+    LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "cache/vectors")
+    LOCAL_INDEX_MAX_CHUNKS = int(os.getenv("LOCAL_INDEX_MAX_CHUNKS", 2000))
+    # Re-index an agent's document in place, only embedding changed chunks
+    INCREMENTAL_REINDEX = os.getenv("INCREMENTAL_REINDEX", "true").lower() == "true"
     AGENTOPS_API_KEY = os.getenv("AGENTOPS_API_KEY")
     # MONGODB_URL = os.getenv("MONGODB_URL")
     # MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME")
@@ -28,9 +66,75 @@ class Config:
     EXPOSED_ACTION_URL = os.getenv("EXPOSED_ACTION_URL")
     CRYPTO_SALT = os.getenv("CRYPTO_SALT")
     CRYPTO_SECRET_KEY = os.getenv("CRYPTO_SECRET_KEY")
-    SUPPORTED_FILE_TYPES = {"csv", "pdf", "txt", "json"}
+    # Database connection pool. DB_ROLE selects the pool defaults ("api" or
+    # "worker"), the other settings override them when set.
+    DB_ROLE = os.getenv("DB_ROLE", "api")
+    DB_POOL_SIZE = os.getenv("DB_POOL_SIZE")
+    DB_MAX_OVERFLOW = os.getenv("DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT = os.getenv("DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE = os.getenv("DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING")
+    DB_CONNECT_TIMEOUT = os.getenv("DB_CONNECT_TIMEOUT")
     BASE_URL = os.getenv("BASE_URL")
 
+    # Completed task listing
+    TASK_LIST_PAGE_SIZE = int(os.getenv("TASK_LIST_PAGE_SIZE", 100))
+    TASK_LIST_MAX_PAGE_SIZE = int(os.getenv("TASK_LIST_MAX_PAGE_SIZE", 500))
+    TASK_LIST_STREAM_BATCH_SIZE = int(os.getenv("TASK_LIST_STREAM_BATCH_SIZE", 500))
+
+    # Agent task execution: "sync" runs one crew per Celery task with async_to_sync,
+    # "async" multiplexes crews of a worker process on one shared event loop
+    TASK_EXECUTION_MODE = os.getenv("TASK_EXECUTION_MODE", "sync")
+    AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", 16))
+    AGENT_TASK_TIMEOUT = float(os.getenv("AGENT_TASK_TIMEOUT", 900))
+
+    # Celery workers (see src/celeryconfig.py): pool ("prefork", "threads",
+    # "gevent" or "solo") and concurrency of every worker profile
+    CELERY_INGESTION_POOL = os.getenv("CELERY_INGESTION_POOL", "prefork")
+    CELERY_INGESTION_CONCURRENCY = int(os.getenv("CELERY_INGESTION_CONCURRENCY", 2))
+    CELERY_AGENT_POOL = os.getenv("CELERY_AGENT_POOL", "threads")
+    CELERY_AGENT_CONCURRENCY = int(os.getenv("CELERY_AGENT_CONCURRENCY", 16))
+    CELERY_SUMMARY_POOL = os.getenv("CELERY_SUMMARY_POOL", "threads")
+    CELERY_SUMMARY_CONCURRENCY = int(os.getenv("CELERY_SUMMARY_CONCURRENCY", 4))
+    CELERY_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_PREFETCH_MULTIPLIER", 1))
+    CELERY_ACKS_LATE = os.getenv("CELERY_ACKS_LATE", "true").lower() == "true"
+    # Must exceed the longest task, or Redis delivers an unacknowledged task again
+    CELERY_VISIBILITY_TIMEOUT = int(os.getenv("CELERY_VISIBILITY_TIMEOUT", 4 * 3600))
+    CELERY_MAX_TASKS_PER_CHILD = int(os.getenv("CELERY_MAX_TASKS_PER_CHILD", 50))
+
+    # Redis used as a shared cache, fails fast so a slow Redis never blocks
+    REDIS_CACHE_TIMEOUT = float(os.getenv("REDIS_CACHE_TIMEOUT", 0.5))
+
+    # Server side chat sessions
+    CHAT_MODEL = os.getenv("CHAT_MODEL", "gpt-3.5-turbo")
+    CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", 2000))
+    CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", 300))
+    CHAT_HISTORY_MAX_TURNS = int(os.getenv("CHAT_HISTORY_MAX_TURNS", 50))
+    CHAT_SESSION_CACHE_TTL = int(os.getenv("CHAT_SESSION_CACHE_TTL", 3600))
+
+    # Task prompt context: token budget, per agent field / parameters cap and
+    # cap of every previous output but the most recent one
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 8000))
+    PROMPT_FIELD_MAX_TOKENS = int(os.getenv("PROMPT_FIELD_MAX_TOKENS", 1000))
+    PROMPT_PREVIOUS_OUTPUT_MAX_TOKENS = int(
+        os.getenv("PROMPT_PREVIOUS_OUTPUT_MAX_TOKENS", 1000)
+    )
+
+    # Agent templates (agent configs, without memory) cached per worker process
+    CREW_TEMPLATE_CACHE_SIZE = int(os.getenv("CREW_TEMPLATE_CACHE_SIZE", 128))
+
+    # Workflow runs: seconds the state of a run is kept in Redis
+    WORKFLOW_RUN_TTL = int(os.getenv("WORKFLOW_RUN_TTL", 24 * 3600))
+
+    # Bulk task submission: most tasks accepted by one request
+    TASK_BULK_MAX_SIZE = int(os.getenv("TASK_BULK_MAX_SIZE", 500))
+
+    # Task result reuse: seconds an agent task output is reused by identical
+    # submissions (0, the default, disables reuse) and seconds before a
+    # submission retries while an identical one is running
+    TASK_RESULT_CACHE_TTL = int(os.getenv("TASK_RESULT_CACHE_TTL", 0))
+    TASK_RESULT_RETRY_COUNTDOWN = int(os.getenv("TASK_RESULT_RETRY_COUNTDOWN", 15))
+
     # Additional API Keys
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
@@ -1,11 +1,61 @@
+import threading
 from src.config import Config
 from langchain_openai import ChatOpenAI
+from src.utils.cache import TTLCache
+from src.utils.llm_cache import CachedLLM, llm_cache
 from src.utils.logger import logger_set
 from src.crew.serializers import OutputFile
 from crewai.tasks.task_output import TaskOutput
 from crewai import Agent, Process, Task, Crew
 from src.agent.models import Agent as AgentModel
 from src.crew.prompts import get_comment_task_prompt
+from src.crew.tools import get_tool_name
+
+# Per process LLM clients by model name
+_llms: dict[str, ChatOpenAI] = {}
+_cached_llms: dict[str, CachedLLM] = {}
+_llms_lock = threading.Lock()
+
+# Per process agent templates by (agent id, tool names, updated_at, model)
+_agent_templates = TTLCache(maxsize=Config.CREW_TEMPLATE_CACHE_SIZE)
+
+
+def get_llm(model: str = Config.MODEL_NAME) -> ChatOpenAI:
+    """Return the ChatOpenAI client of model, shared by the whole process."""
+    llm = _llms.get(model)
+    if llm is None:
+        with _llms_lock:
+            llm = _llms.get(model)
+            if llm is None:
+                llm = ChatOpenAI(model=model, api_key=Config.OPENAI_API_KEY)
+                _llms[model] = llm
+
+    return llm
+
+
+def get_role_llm(role: str, model: str = Config.MODEL_NAME):
+    """
+    Return the LLM of an agent role: a response cached CachedLLM when the role
+    is listed in Config.LLM_CACHE_ROLES, the shared ChatOpenAI client otherwise.
+    """
+    if not llm_cache.enabled_for(role):
+        return get_llm(model)
+
+    llm = _cached_llms.get(model)
+    if llm is None:
+        with _llms_lock:
+            llm = _cached_llms.get(model)
+            if llm is None:
+                chat_model = get_llm(model)
+                llm = CachedLLM(
+                    model=model,
+                    cache=llm_cache,
+                    api_key=Config.OPENAI_API_KEY,
+                    temperature=chat_model.temperature,
+                )
+                _cached_llms[model] = llm
+
+    return llm
 
 
 class CustomAgent:
@@ -26,6 +76,12 @@ class CustomAgent:
         description (str): The description of the primary task.
         tasks (list[Task]): A list of tasks to be performed.
         crew (Crew): A crew object managing the agents and tasks.
+
+    The LLM client is shared per model, and the agents are built once per
+    (agent id, tool names, updated_at, model) and copied for every run. Every
+    run gets its own crew and memory, so concurrent runs of one agent never
+    share context. Roles listed in Config.LLM_CACHE_ROLES answer repeated calls
+    from the LLM cache.
     """
 
     def __init__(
@@ -37,17 +93,29 @@ class CustomAgent:
         params: dict = {},
         model: str = Config.MODEL_NAME,
     ):
-        self.model = ChatOpenAI(
-            model=model,
-            api_key=Config.OPENAI_API_KEY,
-        )
+        self.model = get_llm(model)
+        self.model_name = model
         self.agent = agent
         self.tools = tools
+        self.template_key = (
+            agent.id,
+            tuple(get_tool_name(tool) for tool in tools),
+            agent.updated_at,
+            model,
+        )
 
         self.agent_instruction = agent_instruction
         self.agent_output = agent_output
         self.params = params
 
+    def __get_template(self) -> list[Agent]:
+        template = _agent_templates.get(self.template_key)
+        if template is None:
+            template = self.__create_agent()
+            _agent_templates.set(self.template_key, template)
+
+        return template
+
     def __create_agent(self) -> list[Agent]:
         logger_set.info("Agent creation started")
 
@@ -67,7 +135,7 @@ class CustomAgent:
                 role=self.agent.description,
                 goal=self.agent.key_feature,
                 backstory=self.agent.personality,
-                llm=self.model,
+                llm=get_role_llm(self.agent.description, self.model_name),
                 tools=self.tools,
                 verbose=False,
             )
@@ -78,7 +146,7 @@ class CustomAgent:
                     role="Comment agent",
                     goal="Comment on the previous task completed by agents.",
                     backstory="You are an observer of tasks being completed by agents and check if tasks are being completed as expected.",
-                    llm=self.model,
+                    llm=get_role_llm("Comment agent", self.model_name),
                     verbose=False,
                 )
                 agent_list.append(comment_agent)
@@ -130,7 +198,7 @@ class CustomAgent:
         return crew
 
     async def main(self) -> tuple[TaskOutput, TaskOutput]:
-        self.custom_agent = self.__create_agent()
+        self.custom_agent = [agent.copy() for agent in self.__get_template()]
         self.tasks = self.__create_tasks()
         self.crew = self.__create_crew()
 
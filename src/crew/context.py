@@ -0,0 +1,138 @@
+import hashlib
+import re
+from typing import Optional
+from src.config import Config
+from src.utils.logger import logger_set
+from src.utils.tokens import count_tokens, truncate_tokens
+
+
+class ContextPacker:
+    """
+    Fits the variable sections of a task prompt into a token budget.
+
+    Agent fields and parameters are capped at field_max_tokens each and always
+    kept. The remaining budget is filled with previous outputs, newest (last)
+    first, then document chunks in retrieval rank order. Every previous output
+    but the newest is truncated to previous_output_max_tokens, content already
+    packed is skipped, and whatever does not fit is dropped.
+    """
+
+    TRUNCATED = " [...]"
+    # Smallest remainder worth filling with a truncated section
+    MIN_SECTION_TOKENS = 50
+
+    def __init__(
+        self,
+        budget: int = Config.PROMPT_TOKEN_BUDGET,
+        field_max_tokens: int = Config.PROMPT_FIELD_MAX_TOKENS,
+        previous_output_max_tokens: int = Config.PROMPT_PREVIOUS_OUTPUT_MAX_TOKENS,
+        model: str = Config.MODEL_NAME,
+    ):
+        self.budget = budget
+        self.field_max_tokens = field_max_tokens
+        self.previous_output_max_tokens = previous_output_max_tokens
+        self.model = model
+
+    def pack(
+        self,
+        reserved: str,
+        fields: dict,
+        previous_output: Optional[list[str]] = None,
+        doc_context: Optional[list[str]] = None,
+    ) -> dict:
+        """
+        Args:
+            reserved (str): Fixed prompt text (instructions and template) that
+                counts against the budget but is never cut.
+            fields (dict): Always included sections by name, e.g. agent data.
+            previous_output (list[str], optional): Outputs of earlier tasks,
+                oldest first.
+            doc_context (list[str], optional): Retrieved chunks, best first.
+
+        Returns:
+            dict: The packed "fields", "previous_output" and "doc_context",
+            the "tokens" used and the number of "dropped" sections.
+        """
+        used = self._count(reserved)
+        seen = set()
+        dropped = 0
+
+        packed_fields = {}
+        for name, value in fields.items():
+            text = "" if value is None else str(value)
+            text = self._truncate(text, self.field_max_tokens)
+            packed_fields[name] = text
+            used += self._count(text)
+
+        previous_output = list(previous_output or [])
+        packed_previous = [None] * len(previous_output)
+        for position in range(len(previous_output) - 1, -1, -1):
+            text = previous_output[position]
+            if position < len(previous_output) - 1:
+                text = self._truncate(text, self.previous_output_max_tokens)
+            text, tokens = self._fit(text, used, seen)
+            if text is None:
+                dropped += 1
+                continue
+            packed_previous[position] = text
+            used += tokens
+
+        packed_docs = []
+        for chunk in doc_context or []:
+            text, tokens = self._fit(chunk, used, seen)
+            if text is None:
+                dropped += 1
+                continue
+            packed_docs.append(text)
+            used += tokens
+
+        return {
+            "fields": packed_fields,
+            "previous_output": [text for text in packed_previous if text is not None],
+            "doc_context": packed_docs,
+            "tokens": used,
+            "dropped": dropped,
+        }
+
+    def report(self, prompt: str, name: str, dropped: int = 0) -> int:
+        """Log and return the token count of the final prompt."""
+        tokens = self._count(prompt)
+        logger_set.info(
+            f"{name} prompt tokens : {tokens} (budget {self.budget}, dropped sections {dropped})"
+        )
+        return tokens
+
+    def _fit(self, text: str, used: int, seen: set) -> tuple[Optional[str], int]:
+        """
+        Text, truncated to the remaining budget if needed, and its tokens. None
+        for empty or already packed content, or when no budget is left.
+        """
+        key = self._fingerprint(text)
+        if not text or key in seen:
+            return None, 0
+        seen.add(key)
+
+        remaining = self.budget - used
+        tokens = self._count(text)
+        if tokens <= remaining:
+            return text, tokens
+        if remaining < self.MIN_SECTION_TOKENS:
+            return None, 0
+
+        text = self._truncate(text, remaining)
+        return text, self._count(text)
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        if self._count(text) <= max_tokens:
+            return text
+
+        max_tokens = max(max_tokens - self._count(self.TRUNCATED), 0)
+        return truncate_tokens(text, max_tokens, self.model) + self.TRUNCATED
+
+    def _count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    @staticmethod
+    def _fingerprint(text: str) -> str:
+        normalized = re.sub(r"\s+", " ", text).strip().lower()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
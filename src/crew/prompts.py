@@ -1,4 +1,10 @@
 from src.agent.models import Agent
+from src.crew.context import ContextPacker
+
+EXPECTED_OUTPUT = """
+        ### Expected Output:
+        Synthesize the above data and provide comprehensive, actionable insights. Prioritize clarity, relevance, and alignment with the task requirements.
+        """
 
 
 def get_task_prompt() -> str:
@@ -46,30 +52,40 @@ def get_desc_prompt(
 
         ### Provided Context:
         """
-    if doc_context:
-        prompt += f"- **Document Context**: {doc_context}\n"
-
-    prompt += f"- **Focus Group Survey**: {agent.focus_group_survey}\n"
-    prompt += f"- **Top Ideas**: {agent.top_idea}\n"
-    prompt += f"- **API Data**: {agent.api_data}\n"
-    prompt += f"- **General Survey**: {agent.survey}\n"
-
-    if previous_output:
-        prompt += f"\n### Build Upon: {previous_output}\n"
-
-    if params:
-        prompt += f"\n### Parameters:\n{params}\n"
-
+    reassign_note = ""
     if reassign_reason:
-        prompt += f"""
+        reassign_note = f"""
             ### Strict Reassign Note:
             The task has been reassigned due to the following reason: **{reassign_reason}**. Ensure the response adheres strictly to this note and avoids repeating errors."""
-    
-    prompt += """
-        ### Expected Output:
-        Synthesize the above data and provide comprehensive, actionable insights. Prioritize clarity, relevance, and alignment with the task requirements.
-        """
-    return prompt.strip()
+
+    packer = ContextPacker()
+    context = packer.pack(
+        reserved=prompt + reassign_note + EXPECTED_OUTPUT,
+        fields=get_agent_context_fields(agent, params),
+        previous_output=previous_output,
+        doc_context=doc_context,
+    )
+    fields = context["fields"]
+
+    if context["doc_context"]:
+        prompt += f"- **Document Context**: {context['doc_context']}\n"
+
+    prompt += f"- **Focus Group Survey**: {fields['focus_group_survey']}\n"
+    prompt += f"- **Top Ideas**: {fields['top_idea']}\n"
+    prompt += f"- **API Data**: {fields['api_data']}\n"
+    prompt += f"- **General Survey**: {fields['survey']}\n"
+
+    if context["previous_output"]:
+        prompt += f"\n### Build Upon: {context['previous_output']}\n"
+
+    if fields["params"]:
+        prompt += f"\n### Parameters:\n{fields['params']}\n"
+
+    prompt += reassign_note
+    prompt += EXPECTED_OUTPUT
+    prompt = prompt.strip()
+    packer.report(prompt, "Task", context["dropped"])
+    return prompt
 
 def get_reassign_prompt(
     agent: Agent, agent_instruction, previous_output, doc_context, params, reassign_reason = None
@@ -90,26 +106,44 @@ def get_reassign_prompt(
 
         """
 
-    if doc_context:
-        prompt += f"- **Document Context**: {doc_context}\n"
+    packer = ContextPacker()
+    context = packer.pack(
+        reserved=prompt + EXPECTED_OUTPUT,
+        fields=get_agent_context_fields(agent, params),
+        previous_output=previous_output,
+        doc_context=doc_context,
+    )
+    fields = context["fields"]
 
-    prompt += f"- **Focus Group Survey**: {agent.focus_group_survey}\n"
-    prompt += f"- **Top Ideas**: {agent.top_idea}\n"
-    prompt += f"- **API Data**: {agent.api_data}\n"
-    prompt += f"- **General Survey**: {agent.survey}\n"
+    if context["doc_context"]:
+        prompt += f"- **Document Context**: {context['doc_context']}\n"
 
-    if previous_output:
-        prompt += f"\n### Previous Output: {previous_output}\n"
+    prompt += f"- **Focus Group Survey**: {fields['focus_group_survey']}\n"
+    prompt += f"- **Top Ideas**: {fields['top_idea']}\n"
+    prompt += f"- **API Data**: {fields['api_data']}\n"
+    prompt += f"- **General Survey**: {fields['survey']}\n"
 
-    if params:
-        prompt += f"\n### Parameters:\n{params}\n"
+    if context["previous_output"]:
+        prompt += f"\n### Previous Output: {context['previous_output']}\n"
 
-    
-    prompt += """
-        ### Expected Output:
-        Synthesize the above data and provide comprehensive, actionable insights. Prioritize clarity, relevance, and alignment with the task requirements.
-        """
-    return prompt.strip()
+    if fields["params"]:
+        prompt += f"\n### Parameters:\n{fields['params']}\n"
+
+    prompt += EXPECTED_OUTPUT
+    prompt = prompt.strip()
+    packer.report(prompt, "Reassign", context["dropped"])
+    return prompt
+
+
+def get_agent_context_fields(agent: Agent, params) -> dict:
+    """Agent data and task parameters, always included in task prompts."""
+    return {
+        "focus_group_survey": agent.focus_group_survey,
+        "top_idea": agent.top_idea,
+        "api_data": agent.api_data,
+        "survey": agent.survey,
+        "params": params,
+    }
 
 
 async def get_chat_bot_prompt(
@@ -1,32 +1,15 @@
 import json
 import os
+import threading
 import requests
 from enum import Enum
-from crewai_tools import (
-    tool,
-    DallETool,
-    ScrapeWebsiteTool,
-    YoutubeChannelSearchTool,
-    YoutubeVideoSearchTool,
-)
-from langchain.tools import Tool
-from langchain_community.tools import (
-    TavilySearchResults,
-    google_trends,
-    WikipediaQueryRun,
-    RedditSearchRun,
-)
-from langchain_community.utilities import (
-    GoogleSerperAPIWrapper,
-    google_trends as google_trends_weapper,
-    WikipediaAPIWrapper,
-    reddit_search,
-)
-from langchain_community.tools.reddit_search.tool import RedditSearchSchema
-from langchain_community.utilities import OpenWeatherMapAPIWrapper
-from crewai import Crew, Task, Agent
+from typing import Any
 from src.config import Config
 
+# Tool dependencies (crewai_tools, langchain_community, ...) are heavy and some
+# tools need API keys at construction time, so they are imported and built
+# lazily by the factories below and cached per process by get_tool.
+
 
 class CustomTools:
     """
@@ -39,6 +22,8 @@ class CustomTools:
 
     @staticmethod
     def dalle_tool():
+        from crewai_tools import DallETool
+
         tool = DallETool(
             model="dall-e-3",
             size="1024x1024",
@@ -49,16 +34,22 @@ class CustomTools:
 
     @staticmethod
     def scrape_website():
+        from crewai_tools import ScrapeWebsiteTool
+
         tool = ScrapeWebsiteTool()
         return tool
 
     @staticmethod
     def youtube_channel_search():
+        from crewai_tools import YoutubeChannelSearchTool
+
         tool = YoutubeChannelSearchTool()
         return tool
 
     @staticmethod
     def youtube_video_search():
+        from crewai_tools import YoutubeVideoSearchTool
+
         tool = YoutubeVideoSearchTool()
         return tool
 
@@ -70,6 +61,9 @@ class CustomTools:
         search_depth: str = "advanced",
         include_answer: bool = True,
     ):
+        from langchain.tools import Tool
+        from langchain_community.tools import TavilySearchResults
+
         search = TavilySearchResults(
             max_results=max_results,
             search_depth=search_depth,
@@ -89,6 +83,9 @@ class CustomTools:
         description: str = "search results",
         serper_api_key: str = None,
     ):
+        from langchain.tools import Tool
+        from langchain_community.utilities import GoogleSerperAPIWrapper
+
         search = GoogleSerperAPIWrapper(serper_api_key=serper_api_key)
 
         tool = Tool(
@@ -105,6 +102,12 @@ class CustomTools:
         description: str = "search trends",
         serpapi_api_key: str = None,
     ):
+        from langchain.tools import Tool
+        from langchain_community.tools import google_trends
+        from langchain_community.utilities import (
+            google_trends as google_trends_weapper,
+        )
+
         google_trend_tool = google_trends.GoogleTrendsQueryRun(
             api_wrapper=google_trends_weapper.GoogleTrendsAPIWrapper()
         )
@@ -121,6 +124,9 @@ class CustomTools:
         tool_name: str = "open_weather_map",
         description: str = "find the wether conditions",
     ):
+        from langchain.tools import Tool
+        from langchain_community.utilities import OpenWeatherMapAPIWrapper
+
         os.environ["OPENWEATHERMAP_API_KEY"] = Config.OPENWEATHERMAP_API_KEY
         open_weather_api = OpenWeatherMapAPIWrapper()
         tool = Tool(
@@ -135,6 +141,10 @@ class CustomTools:
         tool_name: str = "wikipedia",
         description: str = "Wikipedia is a multilingual free online encyclopedia written and maintained by a community of volunteers, known as Wikipedians",
     ):
+        from langchain.tools import Tool
+        from langchain_community.tools import WikipediaQueryRun
+        from langchain_community.utilities import WikipediaAPIWrapper
+
         wikipedia_tool = WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper())
 
         tool = Tool(
@@ -145,7 +155,6 @@ class CustomTools:
 
         return tool
 
-    @tool("RedditTool")
     @staticmethod
     def reddit_search_tool(
         query: str,
@@ -159,6 +168,11 @@ class CustomTools:
         """
         reddit tools
         """
+        from langchain.tools import Tool
+        from langchain_community.tools import RedditSearchRun
+        from langchain_community.tools.reddit_search.tool import RedditSearchSchema
+        from langchain_community.utilities import reddit_search
+
         search = RedditSearchRun(
             api_wrapper=reddit_search.RedditSearchAPIWrapper(
                 reddit_client_id=Config.REDIT_CLIENT_ID,
@@ -195,7 +209,6 @@ class CustomTools:
 
     #     return tool
 
-    @tool("ExposeAction")
     @staticmethod
     def exposed_action(api_key: str) -> dict:
         """Fetch the valid action id for the given instruction
@@ -220,7 +233,6 @@ class CustomTools:
 
         return response.json()
 
-    @tool("ZapierTools")
     @staticmethod
     def zapier_nla_tool(api_key: str, instructions: str):
         """Perform actions based on the action id provided using Zapier's Natural Language Analytics
@@ -233,12 +245,16 @@ class CustomTools:
         Returns:
             dict: JSON response of the task performed
         """
+        from crewai import Agent, Crew, Task
+        from src.crew.agents import get_role_llm
+
         action_id_agent = Agent(
             name="Zapier Action ID Fetcher",
             role="Identifier retriever for Zapier actions",
+            llm=get_role_llm("Identifier retriever for Zapier actions"),
             goal="Retrieve the correct action ID from Zapier's exposed action route based on user-provided action instructions, enabling accurate execution of intended workflows.",
             backstory="Retrieve the correct action ID from Zapier's exposed action route based on user-provided action instructions, enabling accurate execution of intended workflows.",
-            tools=[CustomTools.exposed_action],
+            tools=[as_crewai_tool("ExposeAction", CustomTools.exposed_action)],
         )
         task_one = Task(
             name="ID Fetcher Task",
@@ -290,18 +306,89 @@ class ToolsParameters:
     ZAPIER_NLA_PARAMS = {"api_key": "str"}
 
 
+def as_crewai_tool(name: str, func):
+    from crewai_tools import tool
+
+    return tool(name)(func)
+
+
 class ToolKit(Enum):
-    YOUTUBE_VIDEO_SEARCH = (CustomTools.youtube_video_search(), {}, False)
-    YOUTUBE_CHANNEL_SEARCH = (CustomTools.youtube_channel_search(), {}, False)
-    DALLE_TOOL = (CustomTools.dalle_tool(), {}, False)
-    SCRAPE_WEBSITE = (CustomTools.scrape_website(), {}, False)
-    TAVILY_SEARCH = (CustomTools.tavily_search_results(), {}, False)
-    GOOGLE_TRENDS = (CustomTools.google_trends_api(), {}, False)
-    OPEN_WEATHER_MAP = (CustomTools.open_weather_map(), {}, False)
-    WIKIPEDIA = (CustomTools.wikipedia(), {}, False)
-    ZAPIER_NLA = (CustomTools.zapier_nla_tool, ToolsParameters.ZAPIER_NLA_PARAMS, False)
+    """
+    Registry of the available tools.
+
+    Each member holds (factory, parameters, requires_params). Reading the
+    metadata never builds the tool, use ToolKit.<NAME>.tool (or get_tool) to
+    get the cached instance.
+    """
+
+    YOUTUBE_VIDEO_SEARCH = (CustomTools.youtube_video_search, {}, False)
+    YOUTUBE_CHANNEL_SEARCH = (CustomTools.youtube_channel_search, {}, False)
+    DALLE_TOOL = (CustomTools.dalle_tool, {}, False)
+    SCRAPE_WEBSITE = (CustomTools.scrape_website, {}, False)
+    TAVILY_SEARCH = (CustomTools.tavily_search_results, {}, False)
+    GOOGLE_TRENDS = (CustomTools.google_trends_api, {}, False)
+    OPEN_WEATHER_MAP = (CustomTools.open_weather_map, {}, False)
+    WIKIPEDIA = (CustomTools.wikipedia, {}, False)
+    ZAPIER_NLA = (
+        lambda: as_crewai_tool("ZapierTools", CustomTools.zapier_nla_tool),
+        ToolsParameters.ZAPIER_NLA_PARAMS,
+        False,
+    )
     REDDIT_SEARCH = (
-        CustomTools.reddit_search_tool,
+        lambda: as_crewai_tool("RedditTool", CustomTools.reddit_search_tool),
         ToolsParameters.REDDIT_SEARCH_PARAMS,
         True,
     )
+
+    @property
+    def factory(self):
+        return self.value[0]
+
+    @property
+    def parameters(self) -> dict:
+        return self.value[1]
+
+    @property
+    def requires_params(self) -> bool:
+        return self.value[2]
+
+    @property
+    def tool(self) -> Any:
+        return get_tool(self.name)
+
+    @classmethod
+    def names(cls) -> set[str]:
+        return set(cls.__members__)
+
+
+_tool_instances: dict[str, Any] = {}
+_tool_instances_lock = threading.Lock()
+
+
+def get_tool(name: str) -> Any:
+    """
+    Return the tool registered under name, building it on first use.
+
+    Instances are cached for the lifetime of the process.
+
+    Raises:
+        KeyError: If no tool is registered under name.
+    """
+    tool = _tool_instances.get(name)
+    if tool is None:
+        with _tool_instances_lock:
+            tool = _tool_instances.get(name)
+            if tool is None:
+                tool = ToolKit[name].factory()
+                _tool_instances[name] = tool
+
+    return tool
+
+
+def get_tool_name(tool: Any) -> str:
+    """ToolKit name of a tool instance, or its own name if it is not registered."""
+    for name, instance in list(_tool_instances.items()):
+        if instance is tool:
+            return name
+
+    return getattr(tool, "name", None) or type(tool).__name__
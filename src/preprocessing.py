@@ -1,17 +1,58 @@
+import re
+from functools import lru_cache
 import nltk
 from langchain_text_splitters import CharacterTextSplitter
 from src.config import Config
 from langchain_openai import OpenAIEmbeddings
+from nltk.corpus import stopwords
 from nltk.stem import PorterStemmer
+from src.utils.cache import SQLiteStore
+from src.utils.embedding_cache import CachedEmbeddings
+from src.utils.logger import logger_set
 
 nltk.download("punkt_tab")
 nltk.download("stopwords")
 
-# Langchain embeddings and splitter that will be use
-embeddings = OpenAIEmbeddings(
-    api_key=Config.OPENAI_API_KEY, model="text-embedding-3-small"
+# Langchain embeddings and splitter that will be use. Embeddings are cached by
+# content hash so re-uploaded chunks and repeated queries are not re-embedded.
+embeddings = CachedEmbeddings(
+    underlying=OpenAIEmbeddings(
+        api_key=Config.OPENAI_API_KEY, model=Config.EMBEDDING_MODEL
+    ),
+    model=Config.EMBEDDING_MODEL,
+    store=SQLiteStore(
+        path=Config.EMBEDDING_CACHE_PATH,
+        max_entries=Config.EMBEDDING_CACHE_MAX_ENTRIES,
+    ),
 )
 
 splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
 
 porter_stem = PorterStemmer()
+
+_token_pattern = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=100000)
+def stem(token: str) -> str:
+    return porter_stem.stem(token)
+
+
+@lru_cache(maxsize=None)
+def get_stop_words() -> frozenset[str]:
+    """English stopwords, empty when the NLTK corpus could not be downloaded."""
+    try:
+        return frozenset(stopwords.words("english"))
+    except LookupError:
+        logger_set.warning("NLTK stopwords corpus not found, keeping stopwords")
+        return frozenset()
+
+
+def analyze(text: str) -> list[str]:
+    """Lowercased word tokens of text without stopwords, Porter stemmed."""
+    stop_words = get_stop_words()
+    return [
+        stem(token)
+        for token in _token_pattern.findall(text.lower())
+        if token not in stop_words
+    ]
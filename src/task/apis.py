@@ -1,15 +1,27 @@
+import json
 import logging
 import os
+from typing import Optional
 from crewai import Agent, Crew, Task
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db_session
+from database import SessionLocal, get_async_db_session, get_db_session
+from celery import group
+from src.celery import celery_app
 from src.config import Config
 from src.utils.logger import logger_set
-from fastapi.responses import FileResponse, JSONResponse
-from src.task.task import reassign_task_ctrl, task_creation_celery
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from src.task.task import (
+    reassign_task_ctrl,
+    schedule_workflow_tasks,
+    task_creation_celery,
+)
+from src.task.workflow import WorkflowRun, build_task_graph, topological_levels
 from fastapi import APIRouter, HTTPException, Request, Depends
 from src.task.serializers import (
+    BulkCreateTaskSchema,
     CreateTaskSchema,
+    RunWorkflowSchema,
     completed_task_file_serializer,
     completed_task_serializer,
     reassign_completed_task_serializer
@@ -31,50 +43,122 @@ logging.config.fileConfig("logging.conf", disable_existing_loggers=False)
 logger = logging.getLogger(__name__)
 
 
+def serialize_completed_tasks_with_files(db: Session, tasks: list) -> list[dict]:
+    task_ser = completed_task_serializer(tasks=tasks)
+
+    files = TaskCompletedFileController.get_completed_files_by_completed_task_ids(
+        db=db, completed_task_ids=[task["id"] for task in task_ser]
+    )
+    return attach_completed_task_files(task_ser, files)
+
+
+async def serialize_completed_tasks_with_files_async(
+    db: AsyncSession, tasks: list
+) -> list[dict]:
+    task_ser = completed_task_serializer(tasks=tasks)
+
+    files = await TaskCompletedFileController.get_completed_files_by_completed_task_ids_async(
+        db=db, completed_task_ids=[task["id"] for task in task_ser]
+    )
+    return attach_completed_task_files(task_ser, files)
+
+
+def attach_completed_task_files(task_ser: list[dict], files: dict) -> list[dict]:
+    for task in task_ser:
+        task_files = files.get(task["id"])
+        task["urls"] = completed_task_file_serializer(task_files) if task_files else []
+
+    return task_ser
+
+
+def stream_completed_tasks():
+    """Yield every completed task as one NDJSON line, batch by batch."""
+    # MySQL cannot run other queries on a connection while a server side
+    # cursor is open on it, so file lookups go through a second session.
+    db = SessionLocal()
+    files_db = SessionLocal()
+    try:
+        for batch in TaskCompletedTaskDetails.iter_completed_task_batches(db):
+            lines = [
+                json.dumps(task) + "\n"
+                for task in serialize_completed_tasks_with_files(
+                    db=files_db, tasks=batch
+                )
+            ]
+            files_db.expunge_all()
+            yield "".join(lines)
+    except Exception as e:
+        logger_set.error(f"Error streaming completed tasks : {e}")
+        raise
+    finally:
+        files_db.close()
+        db.close()
+
+
 @router.get("")
-async def get_task(request: Request, id: int, db: Session = Depends(get_db_session)):
+async def get_task(
+    request: Request,
+    id: Optional[int] = None,
+    cursor: Optional[int] = None,
+    limit: int = Config.TASK_LIST_PAGE_SIZE,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db_session),
+):
     """
-    Retrieve a task by its ID and return its details as a JSON response.
+    Retrieve completed tasks and return their details as a JSON response.
 
     This function performs the following steps:
-    1. Calls the get_tasks_ctrl function with the provided ID to retrieve the task.
-    2. Constructs a JSON response containing the task's details.
+    1. With an ID, returns every completed task of that task.
+    2. Without an ID, returns one keyset paginated page of all completed tasks,
+       or streams all of them as NDJSON when stream is set.
 
     Args:
-        id (str): The unique identifier of the task to retrieve.
+        id (int, optional): The task whose completed tasks should be returned.
+        cursor (int, optional): The next_cursor returned by the previous page.
+        limit (int): Page size, capped at Config.TASK_LIST_MAX_PAGE_SIZE.
+        stream (bool): Stream all completed tasks as application/x-ndjson.
 
     Returns:
-        JSONResponse: A response containing the task details, including:
-            - id: The task's unique identifier.
-            - description: The task's description.
-            - agent_id: The ID of the agent associated with the task.
+        JSONResponse: A response containing the completed task details, including:
+            - id: The completed task's unique identifier.
+            - task_id: The ID of the task it belongs to.
             - output: The task's response or output.
             - comment: Any comments associated with the task.
             - status: The current status of the task.
             - created_at: The timestamp when the task was created (as a string).
+            - urls: The files attached to the completed task.
+        and "next_cursor" when listing without an ID.
     """
     try:
-        id = request.query_params.get("id")
         logger.info("Task get endpoint")
+        data = {}
         if id:
-            tasks = TaskCompletedTaskDetails.get_completed_task_by_task_id(db, id)
+            tasks = await TaskCompletedTaskDetails.get_completed_task_by_task_id_async(
+                db, id
+            )
+        elif stream:
+            logger_set.info("Streaming completed tasks.")
+            return StreamingResponse(
+                stream_completed_tasks(), media_type="application/x-ndjson"
+            )
         else:
-            tasks = TaskCompletedTaskDetails.get_all_completed_task(db)
-
-        task_ser = completed_task_serializer(tasks=tasks)
-
-        for i, task in enumerate(task_ser):
-            file = TaskCompletedFileController.get_completed_file_details(
-                db=db, completed_task_id=task["id"]
+            if limit < 1:
+                raise HTTPException(status_code=400, detail="limit must be positive")
+            tasks, next_cursor = await TaskCompletedTaskDetails.get_completed_task_page_async(
+                db, cursor=cursor, limit=min(limit, Config.TASK_LIST_MAX_PAGE_SIZE)
             )
-            task_ser[i]["urls"] = completed_task_file_serializer(file) if file else []
+            data["next_cursor"] = next_cursor
+
+        data["completed_tasks"] = await serialize_completed_tasks_with_files_async(
+            db=db, tasks=tasks
+        )
 
         logger_set.info("Task listed successfully.")
         return JSONResponse(
             status_code=200,
             content={
                 "message": "Task fetched",
-                "data": {"completed_tasks": task_ser},
+                "data": data,
                 "error_msg": "",
                 "error": "",
             },
@@ -187,13 +271,182 @@ def create_task(
         )
 
 
+@router.post("/bulk")
+def create_tasks_bulk(
+    payload: BulkCreateTaskSchema, request: Request, db: Session = Depends(get_db_session)
+):
+    """
+    Start many tasks in one call. All task ids are validated with one query,
+    the completed task rows are written with one multi-row insert and the
+    Celery messages are published as one group over a single producer.
+    """
+    logger.info("Bulk task create endpoint")
+    try:
+        items = payload.tasks
+        if not items:
+            raise HTTPException(detail="No tasks given", status_code=400)
+        if len(items) > Config.TASK_BULK_MAX_SIZE:
+            raise HTTPException(
+                detail=f"At most {Config.TASK_BULK_MAX_SIZE} tasks per request",
+                status_code=400,
+            )
+
+        tasks = TaskController.get_tasks_by_ids(db, [item.task_id for item in items])
+        completed_task_ids = TaskCompletedController.insert_completed_tasks(
+            db=db,
+            rows=[
+                {
+                    "task_id": item.task_id,
+                    "from_user": item.from_user,
+                    "to_user": item.to_user,
+                    "from_user_role_id": item.from_user_role_id,
+                }
+                for item in items
+            ],
+        )
+
+        base_url = str(request.base_url)
+        group(
+            task_creation_celery.s(
+                agent_id=tasks[item.task_id].assign_task_agent_id,
+                task_id=item.task_id,
+                base_url=base_url,
+                include_previous_output=item.include_previous_output,
+                previous_outputs=item.previous_output,
+                is_csv=item.is_csv,
+                completed_task_id=completed_task_id,
+            )
+            for item, completed_task_id in zip(items, completed_task_ids)
+        ).apply_async()
+
+        logger_set.info(f"Bulk tasks created successfully, Tasks : {len(items)}")
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "Tasks started",
+                "data": {
+                    "tasks": [
+                        {"task_id": item.task_id, "completed_task_id": completed_task_id}
+                        for item, completed_task_id in zip(items, completed_task_ids)
+                    ]
+                },
+                "status": True,
+                "error": "",
+            },
+        )
+    except HTTPException as e:
+        logger_set.error(f"Could not create tasks : {str(e)}")
+        return JSONResponse(
+            status_code=e.status_code,
+            content={
+                "message": str(e.detail),
+                "data": {},
+                "status": False,
+                "error": str(e.detail),
+            },
+        )
+    except Exception as e:
+        logger_set.info(f"Error creating tasks : {e}")
+        return JSONResponse(
+            status_code=500,
+            content={
+                "message": "Internal server error",
+                "data": {},
+                "status": False,
+                "error": str(e),
+            },
+        )
+
+
+@router.post("/workflow/{workflow_id}/run")
+def run_workflow(
+    workflow_id: int, payload: RunWorkflowSchema, db: Session = Depends(get_db_session)
+):
+    """
+    Run every agent task of a workflow. Dependencies come from parent_task_id
+    and, for tasks using the previous output, the closest lower task_arrange.
+    Independent tasks run in parallel and each output is handed straight to
+    the tasks depending on it, so the run takes as long as its critical path.
+    """
+    logger.info("Run workflow endpoint")
+    try:
+        TaskController.get_workflow_by_id_ctrl(db, workflow_id)
+        tasks = TaskController.get_workflow_agent_tasks(db, workflow_id)
+        if not tasks:
+            raise HTTPException(detail="Workflow has no agent tasks", status_code=404)
+
+        try:
+            agent_ids = {task.id: int(task.assign_task_agent_id) for task in tasks}
+        except ValueError:
+            raise HTTPException(
+                detail="Invalid agent assigned to a workflow task", status_code=400
+            )
+
+        graph = build_task_graph(tasks)
+        levels = topological_levels(graph)
+
+        completed_task_ids = TaskCompletedController.create_completed_tasks(
+            db=db,
+            task_ids=list(graph),
+            from_user=payload.from_user,
+            to_user=payload.to_user,
+            from_user_role_id=payload.from_user_role_id,
+        )
+
+        run = WorkflowRun.start(
+            workflow_id=workflow_id,
+            graph=graph,
+            agent_ids=agent_ids,
+            completed_task_ids=completed_task_ids,
+            is_csv=payload.is_csv,
+        )
+        schedule_workflow_tasks(run.run_id, run.roots())
+
+        logger_set.info(
+            f"Workflow started, Workflow id : {workflow_id}, Run id : {run.run_id}, Tasks : {len(graph)}, Levels : {len(levels)}"
+        )
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "Workflow started",
+                "data": {
+                    "workflow_id": workflow_id,
+                    "run_id": run.run_id,
+                    "completed_task_ids": completed_task_ids,
+                    "levels": levels,
+                },
+                "status": True,
+                "error": "",
+            },
+        )
+    except HTTPException as e:
+        logger_set.error(f"Could not run workflow : {str(e)}")
+        return JSONResponse(
+            status_code=e.status_code,
+            content={
+                "message": str(e.detail),
+                "data": {},
+                "status": False,
+                "error": str(e.detail),
+            },
+        )
+    except Exception as e:
+        logger_set.info(f"Error running workflow : {e}")
+        return JSONResponse(
+            status_code=500,
+            content={
+                "message": "Internal server error",
+                "data": {},
+                "status": False,
+                "error": str(e),
+            },
+        )
+
+
 @router.post("/reassign/{completed_task_id}")
 def reassign_task(completed_task_id: int, request: Request):
     logger.info("Reassign Task  endpoint")
-    try:
-        db = next(get_db_session())
-    except:
-        db = next(get_db_session())
+    db = next(get_db_session())
     try:
         completed_task = TaskCompletedTaskDetails.get_completed_task_by_id(
             db=db, id=completed_task_id
@@ -241,13 +494,64 @@ def reassign_task(completed_task_id: int, request: Request):
         ) 
 
 
+@router.post("/cancel/{completed_task_id}")
+def cancel_task(completed_task_id: int):
+    """
+    Cancel a running agent pipeline. Only pipelines executed with
+    TASK_EXECUTION_MODE=async can be cancelled while running.
+    """
+    logger.info("Cancel Task endpoint")
+    try:
+        replies = celery_app.control.broadcast(
+            "cancel_agent_task",
+            arguments={"completed_task_id": completed_task_id},
+            reply=True,
+            timeout=2,
+        )
+        cancelled = any(
+            reply.get("ok") for worker in replies for reply in worker.values()
+        )
+        if not cancelled:
+            raise HTTPException(status_code=404, detail="Task is not running")
+
+        logger_set.info(f"Task cancelled, Completed task id : {completed_task_id}")
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "Task cancelled",
+                "data": {"completed_task_id": completed_task_id},
+                "status": True,
+                "error": "",
+            },
+        )
+    except HTTPException as e:
+        logger_set.error(f"Could not cancel task : {str(e)}")
+        return JSONResponse(
+            status_code=e.status_code,
+            content={
+                "message": str(e.detail),
+                "data": {},
+                "status": False,
+                "error": str(e.detail),
+            },
+        )
+    except Exception as e:
+        logger_set.info(f"Error cancelling task : {e}")
+        return JSONResponse(
+            status_code=500,
+            content={
+                "message": "Internal server error",
+                "data": {},
+                "status": False,
+                "error": str(e),
+            },
+        )
+
+
 @router.get("/reassign/{completed_task_id}")
 def get_reassign_task(completed_task_id: int, request: Request):
     logger.info("GET Task create endpoint")
-    try:
-        db = next(get_db_session())
-    except:
-        db = next(get_db_session())
+    db = next(get_db_session())
     try:
         completed_task = TaskCompletedTaskDetails.get_completed_task_by_id(
             db=db, id=completed_task_id
@@ -1,6 +1,9 @@
+from collections import defaultdict
 from datetime import datetime
+from typing import Iterator
 from crewai import Agent, Crew, Task
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.config import Config
 from src.task.models import (
@@ -12,9 +15,12 @@ from src.task.models import (
     User,
 )
 from textwrap import dedent
-from sqlalchemy import func
+from sqlalchemy import Select, func, insert, select, text
 from datetime import date
-from langchain_openai import ChatOpenAI
+from src.crew.agents import get_role_llm
+
+# innodb_autoinc_lock_mode of the MySQL server, read once per process
+_autoinc_lock_mode = None
 
 
 class TaskController:
@@ -28,6 +34,45 @@ class TaskController:
 
         raise HTTPException(detail="Task not found", status_code=404)
 
+    @staticmethod
+    def get_tasks_by_ids(db: Session, ids: list[int]) -> dict[int, Tasks]:
+        """
+        Load tasks by id with a single IN query. Missing ids are reported
+        together in one error.
+        """
+        tasks = {
+            task.id: task for task in db.query(Tasks).filter(Tasks.id.in_(set(ids))).all()
+        }
+
+        missing = sorted({str(id) for id in ids if id not in tasks})
+        if missing:
+            raise HTTPException(
+                detail=f"Task not found: {', '.join(missing)}", status_code=404
+            )
+
+        return tasks
+
+    @staticmethod
+    def get_workflow_by_id_ctrl(db: Session, id: int) -> WorkFlow:
+        workflow = db.query(WorkFlow).filter(WorkFlow.id == id).first()
+
+        if workflow:
+            return workflow
+
+        raise HTTPException(detail="Workflow not found", status_code=404)
+
+    @staticmethod
+    def get_workflow_agent_tasks(db: Session, workflow_id: int) -> list[Tasks]:
+        """Tasks of the workflow that are assigned to an agent, in arrange order."""
+        return (
+            db.query(Tasks)
+            .filter(Tasks.workflow_id == workflow_id)
+            .filter(Tasks.assign_task_agent_id.isnot(None))
+            .filter(Tasks.assign_task_agent_id != "")
+            .order_by(Tasks.task_arrange, Tasks.id)
+            .all()
+        )
+
     @staticmethod
     def summary_of_delayed_rework_task_ctrl(db: Session, user_id: int) -> str:
 
@@ -131,8 +176,6 @@ class TaskController:
                 }
             )
 
-        llm = ChatOpenAI(model=Config.MODEL_NAME, api_key=Config.OPENAI_API_KEY)
-
         data_analyst = Agent(
             role="Senior Data Analyst",
             goal="You receive data from the database developer and analyze it",
@@ -144,7 +187,7 @@ class TaskController:
             to detail and always produce very detailed work (as long as you need).
         """
             ),
-            llm=llm,
+            llm=get_role_llm("Senior Data Analyst"),
             allow_delegation=False,
         )
 
@@ -250,6 +293,108 @@ class TaskCompletedController:
 
         return completed_task
 
+    @staticmethod
+    def create_completed_tasks(
+        db: Session,
+        task_ids: list[int],
+        from_user: int,
+        to_user: int,
+        from_user_role_id: int,
+    ) -> dict[int, int]:
+        """Create pending completed task rows for task_ids, returns their ids."""
+        ids = TaskCompletedController.insert_completed_tasks(
+            db=db,
+            rows=[
+                {
+                    "task_id": task_id,
+                    "from_user": from_user,
+                    "to_user": to_user,
+                    "from_user_role_id": from_user_role_id,
+                }
+                for task_id in task_ids
+            ],
+        )
+        return dict(zip(task_ids, ids))
+
+    @staticmethod
+    def insert_completed_tasks(db: Session, rows: list[dict]) -> list[int]:
+        """
+        Insert pending completed task rows (task_id, from_user, to_user and
+        from_user_role_id each) and return their ids in order.
+
+        When the server guarantees consecutive auto-increment ids for a
+        multi-row INSERT (see _consecutive_autoinc), the rows are written with
+        one INSERT and their ids are the range starting at the id MySQL reports
+        for the first row. Otherwise the rows are inserted one by one.
+        """
+        if not rows:
+            return []
+
+        now = datetime.now().replace(microsecond=0)
+        values = [{**row, "status": 0, "created_at": now} for row in rows]
+
+        try:
+            if TaskCompletedController._consecutive_autoinc(db):
+                result = db.execute(insert(CompletedTaskDetails).values(values))
+                ids = list(range(result.lastrowid, result.lastrowid + len(values)))
+            else:
+                completed_tasks = [CompletedTaskDetails(**value) for value in values]
+                db.add_all(completed_tasks)
+                db.flush()
+                ids = [completed_task.id for completed_task in completed_tasks]
+
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(detail="Database error: " + str(e), status_code=400)
+
+        return ids
+
+    @staticmethod
+    def _consecutive_autoinc(db: Session) -> bool:
+        """
+        Whether a multi-row INSERT gets consecutive auto-increment ids. InnoDB
+        guarantees it for simple inserts with innodb_autoinc_lock_mode 0
+        (traditional) or 1 (consecutive), not with 2 (interleaved, the MySQL 8
+        default). The server setting is read once per process.
+        """
+        global _autoinc_lock_mode
+
+        if db.get_bind().dialect.name != "mysql":
+            return False
+
+        if _autoinc_lock_mode is None:
+            _autoinc_lock_mode = int(
+                db.execute(text("SELECT @@innodb_autoinc_lock_mode")).scalar()
+            )
+
+        return _autoinc_lock_mode in (0, 1)
+
+    @staticmethod
+    def mark_completed_tasks_failed(db: Session, completed_task_ids: list[int]) -> int:
+        """Mark completed tasks as failed with a single UPDATE."""
+        if not completed_task_ids:
+            return 0
+
+        count = (
+            db.query(CompletedTaskDetails)
+            .filter(CompletedTaskDetails.id.in_(completed_task_ids))
+            .update(
+                {
+                    CompletedTaskDetails.status: 2,
+                    CompletedTaskDetails.updated_at: datetime.now(),
+                },
+                synchronize_session=False,
+            )
+        )
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(detail=f"Database error: {str(e)}", status_code=400)
+
+        return count
+
     @staticmethod
     def update_completed_task_details(
         db: Session,
@@ -348,10 +493,82 @@ class TaskCompletedTaskDetails:
         raise HTTPException(detail="Completed task not found", status_code=404)
 
     @staticmethod
-    def get_all_completed_task(db: Session):
-        completed_task = db.query(CompletedTaskDetails).all()
+    async def get_completed_task_by_task_id_async(db: AsyncSession, id: int = None):
+        result = await db.execute(
+            select(CompletedTaskDetails)
+            .filter(CompletedTaskDetails.task_id == id)
+            .order_by(CompletedTaskDetails.created_at.desc())
+        )
+        completed_task = result.scalars().all()
 
-        return completed_task
+        if completed_task:
+            return completed_task
+        raise HTTPException(detail="Completed task not found", status_code=404)
+
+    @staticmethod
+    def get_completed_task_page(
+        db: Session, cursor: int = None, limit: int = Config.TASK_LIST_PAGE_SIZE
+    ) -> tuple[list[CompletedTaskDetails], int]:
+        """
+        Keyset paginated listing of completed tasks, newest first.
+
+        The cursor is the id of the last row of the previous page, so every
+        page is a bounded index range scan regardless of how deep it is.
+        Returns the page and the cursor of the next page (None on the last page).
+        """
+        completed_tasks = (
+            db.execute(TaskCompletedTaskDetails._page_query(cursor, limit))
+            .scalars()
+            .all()
+        )
+
+        return TaskCompletedTaskDetails._split_page(completed_tasks, limit)
+
+    @staticmethod
+    async def get_completed_task_page_async(
+        db: AsyncSession, cursor: int = None, limit: int = Config.TASK_LIST_PAGE_SIZE
+    ) -> tuple[list[CompletedTaskDetails], int]:
+        result = await db.execute(TaskCompletedTaskDetails._page_query(cursor, limit))
+
+        return TaskCompletedTaskDetails._split_page(result.scalars().all(), limit)
+
+    @staticmethod
+    def _page_query(cursor: int, limit: int) -> Select:
+        query = select(CompletedTaskDetails)
+        if cursor is not None:
+            query = query.filter(CompletedTaskDetails.id < cursor)
+
+        # One extra row tells whether there is a next page
+        return query.order_by(CompletedTaskDetails.id.desc()).limit(limit + 1)
+
+    @staticmethod
+    def _split_page(
+        completed_tasks: list[CompletedTaskDetails], limit: int
+    ) -> tuple[list[CompletedTaskDetails], int]:
+        next_cursor = None
+        if len(completed_tasks) > limit:
+            completed_tasks = completed_tasks[:limit]
+            next_cursor = completed_tasks[-1].id
+
+        return completed_tasks, next_cursor
+
+    @staticmethod
+    def iter_completed_task_batches(
+        db: Session, batch_size: int = Config.TASK_LIST_STREAM_BATCH_SIZE
+    ) -> Iterator[list[CompletedTaskDetails]]:
+        """
+        Stream every completed task, newest first, in batches of batch_size
+        using a server side cursor so memory does not grow with the table.
+        """
+        result = db.execute(
+            select(CompletedTaskDetails)
+            .order_by(CompletedTaskDetails.id.desc())
+            .execution_options(yield_per=batch_size)
+        )
+        for batch in result.scalars().partitions():
+            yield batch
+            # Rows of a streamed batch are not needed once serialized
+            db.expunge_all()
 
 
 class TaskCompletedFileController:
@@ -388,54 +605,117 @@ class TaskCompletedFileController:
 
         return file_details
 
+    @staticmethod
+    def get_completed_files_by_completed_task_ids(
+        db: Session, completed_task_ids: list[int]
+    ) -> dict[int, list[CompletedTaskDetailFiles]]:
+        """
+        Fetch the files of many completed tasks in one query, grouped by
+        completed_task_detail_id. Completed tasks without files are absent.
+        """
+        if not completed_task_ids:
+            return {}
+
+        files = (
+            db.execute(TaskCompletedFileController._files_query(completed_task_ids))
+            .scalars()
+            .all()
+        )
+
+        return TaskCompletedFileController._group_files(files)
 
-class TaskUtils:
     @staticmethod
-    def get_previous_outputs(db: Session, previous_outputs):
-        previous_output = []
-        res_opt_tsk_id = None
-        for prev_task_id in previous_outputs:
-            response_output = TaskCompletedController.get_completed_task_details_by_id(
-                db=db, id=prev_task_id
-            )
+    async def get_completed_files_by_completed_task_ids_async(
+        db: AsyncSession, completed_task_ids: list[int]
+    ) -> dict[int, list[CompletedTaskDetailFiles]]:
+        if not completed_task_ids:
+            return {}
+
+        result = await db.execute(
+            TaskCompletedFileController._files_query(completed_task_ids)
+        )
 
-            if res_opt_tsk_id == None:
-                res_opt_tsk_id = response_output.task_id
-                output = TaskController.get_tasks_by_id_ctrl(db=db, id=res_opt_tsk_id)
-            elif res_opt_tsk_id != response_output.task_id:
-                res_opt_tsk_id = response_output.task_id
-                output = TaskController.get_tasks_by_id_ctrl(db=db, id=res_opt_tsk_id)
-            previous_output.append(
-                f"""
-                    agent_instruction : {output.agent_instruction},
-                    expected_output: {output.agent_output},
-                    response: {response_output.output},
-                """
+        return TaskCompletedFileController._group_files(result.scalars().all())
+
+    @staticmethod
+    def _files_query(completed_task_ids: list[int]) -> Select:
+        return (
+            select(CompletedTaskDetailFiles)
+            .filter(
+                CompletedTaskDetailFiles.completed_task_detail_id.in_(
+                    set(completed_task_ids)
+                )
             )
+            .order_by(CompletedTaskDetailFiles.id)
+        )
 
-        return previous_output
-    
     @staticmethod
-    def get_previous_outputs_by_completed_task(db: Session, previous_outputs):
-        previous_output = []
-        res_opt_tsk_id = None
-        for prev_task_id in previous_outputs:
-            response_output = TaskCompletedController.get_completed_task_details_by_id(
-                db=db, id=prev_task_id
+    def _group_files(
+        files: list[CompletedTaskDetailFiles],
+    ) -> dict[int, list[CompletedTaskDetailFiles]]:
+        files_by_completed_task = defaultdict(list)
+        for file in files:
+            files_by_completed_task[file.completed_task_detail_id].append(file)
+
+        return files_by_completed_task
+
+
+class TaskUtils:
+    @staticmethod
+    def load_previous_outputs(
+        db: Session, completed_task_ids: list[int]
+    ) -> list[tuple[CompletedTaskDetails, Tasks]]:
+        """
+        Bulk load completed tasks together with their parent task.
+
+        All requested rows are fetched with a single joined query and returned
+        in the caller's order. Missing completed tasks (or completed tasks whose
+        parent task no longer exists) are reported together in one error.
+        """
+        if not completed_task_ids:
+            return []
+
+        rows = (
+            db.query(CompletedTaskDetails, Tasks)
+            .join(Tasks, CompletedTaskDetails.task_id == Tasks.id, isouter=True)
+            .filter(CompletedTaskDetails.id.in_(set(completed_task_ids)))
+            .all()
+        )
+        by_id = {completed_task.id: (completed_task, task) for completed_task, task in rows}
+
+        missing = [str(id) for id in completed_task_ids if id not in by_id]
+        if missing:
+            raise HTTPException(
+                detail=f"Completed task not found: {', '.join(missing)}",
+                status_code=404,
             )
 
-            if res_opt_tsk_id == None:
-                res_opt_tsk_id = response_output.task_id
-                output = TaskController.get_tasks_by_id_ctrl(db=db, id=response_output.task_id)
-            elif res_opt_tsk_id != response_output.task_id:
-                res_opt_tsk_id = response_output.task_id
-                output = TaskController.get_tasks_by_id_ctrl(db=db, id=res_opt_tsk_id)
-            previous_output.append(
-                f"""
-                    agent_instruction : {output.agent_instruction},
-                    expected_output: {output.agent_output},
-                    response: {response_output.output},
-                """ 
+        orphaned = [str(id) for id in completed_task_ids if by_id[id][1] is None]
+        if orphaned:
+            raise HTTPException(
+                detail=f"Task not found for completed task: {', '.join(orphaned)}",
+                status_code=404,
             )
 
-        return previous_output
+        return [by_id[id] for id in completed_task_ids]
+
+    @staticmethod
+    def format_previous_output(completed_task: CompletedTaskDetails, task: Tasks) -> str:
+        return TaskUtils.format_output(task, completed_task.output)
+
+    @staticmethod
+    def format_output(task: Tasks, output: str) -> str:
+        return f"""
+                    agent_instruction : {task.agent_instruction},
+                    expected_output: {task.agent_output},
+                    response: {output},
+                """
+
+    @staticmethod
+    def get_previous_outputs(db: Session, previous_outputs: list[int]) -> list[str]:
+        return [
+            TaskUtils.format_previous_output(completed_task, task)
+            for completed_task, task in TaskUtils.load_previous_outputs(
+                db=db, completed_task_ids=previous_outputs
+            )
+        ]
@@ -0,0 +1,156 @@
+import hashlib
+import json
+from typing import Any, Callable, Optional
+from redis.exceptions import LockError
+from src.config import Config
+from src.utils.cache import get_redis
+from src.utils.logger import logger_set
+
+
+class TaskInFlight(Exception):
+    """An identical execution is running, the submission should retry later."""
+
+
+class TaskResultCache:
+    """
+    Idempotency layer of agent task executions.
+
+    An execution is identified by the hash of its fully resolved inputs (see
+    make_key). A successful execution records its completed task id under that
+    hash for ttl seconds, and an identical submission within that window reuses
+    the stored output instead of running the crew again. An identical
+    submission arriving while one is running raises TaskInFlight, so its Celery
+    task retries later instead of holding a worker slot. When Redis is
+    unavailable every submission runs.
+    """
+
+    def __init__(
+        self,
+        ttl: int = Config.TASK_RESULT_CACHE_TTL,
+        lock_timeout: float = Config.AGENT_TASK_TIMEOUT,
+        retry_countdown: int = Config.TASK_RESULT_RETRY_COUNTDOWN,
+    ):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.retry_countdown = retry_countdown
+        # Retries of a submission before it stops waiting and runs itself
+        self.max_retries = int(lock_timeout // max(retry_countdown, 1)) + 1
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def make_key(**inputs) -> str:
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def execute(
+        self,
+        key: str,
+        owner: int,
+        run: Callable[[], Any],
+        reuse: Callable[[int], Optional[Any]],
+        defer: bool = True,
+    ) -> Any:
+        """
+        Run an execution at most once per freshness window.
+
+        Args:
+            key (str): Hash of the execution inputs.
+            owner (int): Completed task id the result of run is stored on.
+            run (Callable): Runs the execution and stores its result, returns
+                the value to hand back.
+            reuse (Callable): Copies the result stored on the given completed
+                task id, returns None if it can not be reused.
+            defer (bool): Raise TaskInFlight while an identical execution is
+                running, otherwise run anyway.
+
+        Returns:
+            The value of run or reuse.
+
+        Raises:
+            TaskInFlight: If an identical execution is running and defer is set.
+        """
+        if not self.enabled:
+            return run()
+
+        result = self._reuse(key, reuse)
+        if result is not None:
+            return result
+
+        try:
+            lock = get_redis().lock(
+                self._redis_key(key, "lock"), timeout=self.lock_timeout
+            )
+            acquired = lock.acquire(blocking=False)
+        except Exception as e:
+            logger_set.error(f"Task result lock failed : {e}")
+            return run()
+
+        if not acquired:
+            if defer:
+                raise TaskInFlight(key)
+            logger_set.info(f"Identical task still running, running again : {key}")
+            return run()
+
+        try:
+            # The previous holder may have finished since the lookup
+            result = self._reuse(key, reuse)
+            if result is not None:
+                return result
+
+            result = run()
+            self._set(key, owner)
+            return result
+        finally:
+            self._release(lock)
+
+    def _reuse(self, key: str, reuse: Callable[[int], Optional[Any]]) -> Optional[Any]:
+        try:
+            source = get_redis().get(self._redis_key(key, "result"))
+        except Exception as e:
+            logger_set.error(f"Task result cache read failed : {e}")
+            return None
+
+        if source is None:
+            return None
+
+        result = reuse(int(source))
+        if result is None:
+            self._delete(key)
+        else:
+            logger_set.info(f"Reused the output of completed task {int(source)}")
+
+        return result
+
+    def _set(self, key: str, completed_task_id: int) -> None:
+        try:
+            get_redis().set(
+                self._redis_key(key, "result"), completed_task_id, ex=self.ttl
+            )
+        except Exception as e:
+            logger_set.error(f"Task result cache write failed : {e}")
+
+    def _delete(self, key: str) -> None:
+        try:
+            get_redis().delete(self._redis_key(key, "result"))
+        except Exception as e:
+            logger_set.error(f"Task result cache delete failed : {e}")
+
+    @staticmethod
+    def _release(lock) -> None:
+        try:
+            lock.release()
+        except LockError:
+            # Expired while the crew ran, another submission may hold it now
+            pass
+        except Exception as e:
+            logger_set.error(f"Task result lock release failed : {e}")
+
+    @staticmethod
+    def _redis_key(key: str, name: str) -> str:
+        return f"task_result:{key}:{name}"
+
+
+task_result_cache = TaskResultCache()
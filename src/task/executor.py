@@ -0,0 +1,169 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Coroutine, Hashable, Optional
+from src.config import Config
+from src.utils.logger import logger_set
+
+# Pipeline of the coroutine submitting work to the default executor
+_current_pipeline: contextvars.ContextVar = contextvars.ContextVar("agent_pipeline")
+
+
+class _Pipeline:
+    """
+    Executor work of one pipeline. Its concurrency slot is released once the
+    pipeline ended and every thread it started has returned.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: set[Future] = set()
+        self._release = None
+
+    def track(self, future: Future) -> None:
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._finished)
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+            release = self._release if not self._pending else None
+        if release is not None:
+            release()
+
+    def close(self, release) -> None:
+        with self._lock:
+            self._release = release
+            pending = bool(self._pending)
+        if not pending:
+            release()
+
+
+class _PipelineThreadPool(ThreadPoolExecutor):
+    """Default executor of the loop, attributing work to its pipeline."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = super().submit(fn, *args, **kwargs)
+        pipeline = _current_pipeline.get(None)
+        if pipeline is not None:
+            pipeline.track(future)
+        return future
+
+
+class AgentExecutor:
+    """
+    Runs agent pipelines of a worker process concurrently on one event loop.
+
+    The loop lives in a daemon thread and is started lazily, so a Celery worker
+    running with a threads pool can hand many crews to the same loop while each
+    Celery thread only blocks on its own result. Concurrency is capped with a
+    semaphore, every pipeline gets a timeout and running pipelines can be
+    cancelled by key (the completed task id). A timed out or cancelled
+    pipeline keeps its slot until its blocking kickoff thread has returned, so
+    the default executor never has more busy threads than slots.
+
+    Attributes:
+        max_concurrency (int): Maximum number of pipelines running at once.
+        timeout (float): Default per pipeline timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = Config.AGENT_MAX_CONCURRENCY,
+        timeout: float = Config.AGENT_TASK_TIMEOUT,
+    ):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._reset()
+        # A loop thread does not survive fork, start a fresh one in the child
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running: dict[Hashable, Future] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                # crewAI runs blocking kickoffs in the default executor
+                loop.set_default_executor(
+                    _PipelineThreadPool(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix="agent-executor",
+                    )
+                )
+                threading.Thread(
+                    target=loop.run_forever, name="agent-event-loop", daemon=True
+                ).start()
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._loop = loop
+                logger_set.info(
+                    f"Agent event loop started. Max concurrency: {self.max_concurrency}"
+                )
+            return self._loop
+
+    async def _guarded(self, coro: Coroutine, timeout: float) -> Any:
+        await self._semaphore.acquire()
+        pipeline = _Pipeline()
+        token = _current_pipeline.set(pipeline)
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout)
+        finally:
+            _current_pipeline.reset(token)
+            loop, semaphore = self._loop, self._semaphore
+            pipeline.close(lambda: loop.call_soon_threadsafe(semaphore.release))
+
+    def run(
+        self,
+        coro: Coroutine,
+        key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Schedule coro on the shared loop and block the calling thread until it
+        finishes.
+
+        Raises:
+            TimeoutError: The pipeline ran longer than its timeout.
+            concurrent.futures.CancelledError: The pipeline was cancelled.
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self._guarded(coro, timeout or self.timeout), loop
+        )
+        if key is not None:
+            self._running[key] = future
+
+        try:
+            return future.result()
+        finally:
+            if key is not None and self._running.get(key) is future:
+                del self._running[key]
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel a running pipeline. Returns False if it is not running here.
+
+        Blocking work already handed to a thread (e.g. a crew kickoff) runs to
+        completion in the background, but its result is discarded. The
+        concurrency slot is only freed once that thread has returned.
+        """
+        future = self._running.get(key)
+        if future is None:
+            return False
+
+        logger_set.info(f"Cancelling agent pipeline: {key}")
+        return future.cancel()
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+
+agent_executor = AgentExecutor()
@@ -13,6 +13,15 @@ class CreateTaskSchema(BaseModel):
     previous_output: Optional[list[int]] = []
     is_csv: Optional[bool] = False
 
+class BulkCreateTaskSchema(BaseModel):
+    tasks: list[CreateTaskSchema]
+
+class RunWorkflowSchema(BaseModel):
+    from_user: int
+    to_user: int
+    from_user_role_id: int
+    is_csv: Optional[bool] = False
+
 class ReassignTaskSchema(BaseModel):
     completed_task_id: int
     include_previous_output: Optional[bool] = False
@@ -1,5 +1,6 @@
 import io
 import json
+from typing import Optional
 from fastapi.responses import JSONResponse
 import pandas as pd
 from fastapi import HTTPException
@@ -9,16 +10,21 @@ from src.config import Config
 from src.crew.agents import CustomAgent
 from src.crew.prompts import get_desc_prompt, get_reassign_prompt
 from src.task.controllers import TaskCompletedFileController, TaskController, TaskCompletedController, TaskUtils
+from src.task.dedup import TaskInFlight, task_result_cache
+from src.task.models import CompletedTaskDetails, Tasks
 from src.task.serializers import completed_task_file_serializer, completed_task_serializer
+from src.task.workflow import WorkflowRun
 from src.tool.controllers import ToolsController
 from src.utils.pinecone import PineConeConfig
 from src.utils.utils import get_uuid
 from src.celery import celery_app
+from celery import group
+from src.task.executor import agent_executor
 from asgiref.sync import async_to_sync
+from celery.worker.control import control_command
 from src.utils.logger import logger_set
 import boto3
 from botocore.exceptions import NoCredentialsError
-import time
 
 s3_client = boto3.client(
     "s3",
@@ -28,8 +34,217 @@ s3_client = boto3.client(
 )
 
 
-@celery_app.task()
+def run_custom_agent(init_task: CustomAgent, completed_task_id: int) -> tuple:
+    """Run the crew of init_task according to Config.TASK_EXECUTION_MODE."""
+    if Config.TASK_EXECUTION_MODE == "async":
+        return agent_executor.run(init_task.main(), key=completed_task_id)
+
+    return async_to_sync(init_task.main)()
+
+
+@control_command(args=[("completed_task_id", int)])
+def cancel_agent_task(state, completed_task_id: int) -> dict:
+    """Remote control command, cancels the pipeline if it runs in this worker."""
+    return {"ok": agent_executor.cancel(completed_task_id)}
+
+
+def execute_agent_task(
+    db,
+    agent_id: int,
+    task_id: int,
+    previous_output: list[str],
+    is_csv: bool,
+    completed_task_id: int,
+    defer_duplicate: bool = True,
+) -> tuple[Tasks, str]:
+    """
+    Run the agent pipeline of a task and store its result on the completed
+    task. Returns the task and the raw output of the agent.
+
+    Identical executions (same task, agent, tools, parameters, resolved prompt
+    and model) within Config.TASK_RESULT_CACHE_TTL reuse the output of the
+    first one. While an identical execution is running, TaskInFlight is raised
+    if defer_duplicate is set so the Celery task retries later.
+    """
+    agent = AgentController.get_agents_by_id_ctrl(db, agent_id)
+    task = TaskController.get_tasks_by_id_ctrl(db, task_id)
+    task_params = {}
+    params = ""
+
+    try:
+        if task.agent_parameter:
+            task_params = json.loads(task.agent_parameter)
+            keys = list(task_params.keys())
+
+            for i in keys:
+                var = f"{i} = {{{i}}},"
+                params = params + var
+    except Exception as e:
+        pass
+    doc_context = []
+
+    if agent.own_data:
+        if not agent.vector_id:
+            raise HTTPException(
+                detail="Vector of own file not found.", status_code=404
+            )
+
+        namespace = agent.vector_id
+
+        ps = PineConeConfig(
+            api_key=Config.PINECONE_API_KEY,
+            index_name=Config.PINECONE_INDEX_NAME,
+            namespace=namespace,
+        )
+
+        doc_context = ps.similarity_search(
+            query=task.agent_instruction, score_threshold=0.2
+        )
+
+    # Tools
+    tool_ids = json.loads(task.agent_tool)
+    tools = ToolsController.get_tools_list_as_tool_instance(
+        db=db, tool_ids=tool_ids
+    )
+
+    prompt = get_desc_prompt(
+        agent=agent,
+        agent_instruction=task.agent_instruction,
+        previous_output=previous_output,
+        doc_context=doc_context,
+        params=params,
+    )
+
+    init_task = CustomAgent(
+        agent=agent,
+        agent_instruction=prompt,
+        agent_output=task.agent_output,
+        tools=tools,
+        params=task_params,
+    )
+
+    key = task_result_cache.make_key(
+        task_id=task.id,
+        agent_id=agent.id,
+        agent_updated_at=agent.updated_at,
+        model=Config.MODEL_NAME,
+        prompt=prompt,
+        expected_output=task.agent_output,
+        tools=sorted(tool_ids, key=str),
+        params=task_params,
+        is_csv=is_csv,
+    )
+    output = task_result_cache.execute(
+        key,
+        owner=completed_task_id,
+        run=lambda: run_agent_task(init_task, is_csv, db, completed_task_id),
+        reuse=lambda source_id: reuse_task_output(db, source_id, completed_task_id),
+        defer=defer_duplicate,
+    )
+
+    return task, output
+
+
+def run_agent_task(init_task: CustomAgent, is_csv: bool, db, completed_task_id: int) -> str:
+    """Run the crew, store its output on the completed task and return it."""
+    custom_task_output, comment_task_output = run_custom_agent(
+        init_task, completed_task_id
+    )
+
+    max_length = max(len(v) for v in custom_task_output.json_dict.values())
+
+    # Handle the edge cases in which if we do get empty column
+    for key in custom_task_output.json_dict.keys():
+        custom_task_output.json_dict[key] += [None] * (
+            max_length - len(custom_task_output.json_dict[key])
+        )
+
+    full_file_url = None
+    if is_csv:
+        file_name = f"task_output/{get_uuid()}.csv"
+        csv_data = pd.DataFrame(custom_task_output.json_dict)
+        buffer = io.StringIO()
+        csv_data.to_csv(buffer, index=False)
+        buffer.seek(0)
+        s3_client.put_object(
+            Bucket=Config.S3_BUCKET_NAME,
+            Key=file_name,
+            Body=buffer.getvalue(),  # Use the CSV content from the buffer
+            ContentType="text/csv",
+        )
+        # csv_data = pd.DataFrame(custom_task_output.json_dict).to_csv(
+        #     "static/" + file_name, index=False
+        # )
+        # full_file_url = f"static/{file_name}"
+        full_file_url = f"https://{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION_NAME}.amazonaws.com/{file_name}"
+
+        # s3_client.put_object(
+        #     Bucket=Config.S3_BUCKET_NAME,
+        #     Key=file_name,
+        #     Body=csv_data,
+        #     ContentType="text/csv",
+        # )
+    TaskCompletedController.update_completed_task_details(
+        db=db,
+        completed_task_id=completed_task_id,
+        output=custom_task_output.raw,
+        comment=comment_task_output.raw,
+        file_path=full_file_url,
+        status=1,
+        mark_as=1,
+        success=True
+    )
+
+    return custom_task_output.raw
+
+
+def reuse_task_output(db, source_id: int, completed_task_id: int) -> Optional[str]:
+    """
+    Copy the output, comment and file of the completed task source_id to
+    completed_task_id. Returns the output, or None when the source is gone,
+    not completed or was reassigned since.
+    """
+    # End the current transaction to see rows committed by other workers
+    db.commit()
+    source = (
+        db.query(CompletedTaskDetails)
+        .filter(CompletedTaskDetails.id == source_id)
+        .first()
+    )
+    if (
+        source is None
+        or source.status != 1
+        or source.mark_as != 1
+        or source.reason_for_reassign
+    ):
+        return None
+
+    # Redelivery of a task that already finished
+    if source.id == completed_task_id:
+        return source.output
+
+    files = TaskCompletedFileController.get_completed_files_by_completed_task_ids(
+        db=db, completed_task_ids=[source.id]
+    )
+    file_paths = [file.file_name for file in files.get(source.id, [])]
+
+    TaskCompletedController.update_completed_task_details(
+        db=db,
+        completed_task_id=completed_task_id,
+        output=source.output,
+        comment=source.comment,
+        file_path=file_paths[0] if file_paths else None,
+        status=1,
+        mark_as=1,
+        success=True
+    )
+
+    return source.output
+
+
+@celery_app.task(bind=True)
 def task_creation_celery(
+    self,
     agent_id: int,
     task_id: int,
     base_url: str,
@@ -42,123 +257,33 @@ def task_creation_celery(
     try:
         logger_set.info(f"Celery task started. Task Id: {task_id}")
         # with get_db_session() as db:
-        try:
-            db = next(get_db_session())
-        except Exception as e:
-            time.sleep(1)
-            db = next(get_db_session())
-
-        agent = AgentController.get_agents_by_id_ctrl(db, agent_id)
-        task = TaskController.get_tasks_by_id_ctrl(db, task_id)
-        task_params = {}
-        params = ""
-
-        try:
-            if task.agent_parameter:
-                task_params = json.loads(task.agent_parameter)
-                keys = list(task_params.keys())
+        db = next(get_db_session())
 
-                for i in keys:
-                    var = f"{i} = {{{i}}},"
-                    params = params + var
-        except Exception as e:
-            pass
-        doc_context = []
         previous_output = []
-
-        if agent.own_data:
-            if not agent.vector_id:
-                raise HTTPException(
-                    detail="Vector of own file not found.", status_code=404
-                )
-
-            namespace = agent.vector_id
-
-            ps = PineConeConfig(
-                api_key=Config.PINECONE_API_KEY,
-                index_name=Config.PINECONE_INDEX_NAME,
-                namespace=namespace,
-            )
-
-            doc_context = ps.similarity_search(
-                query=task.agent_instruction, score_threshold=0.2
-            )
-
         if include_previous_output:
             previous_output = TaskUtils.get_previous_outputs(
                 db=db, previous_outputs=previous_outputs
             )
 
-        # Tools
-        tool_ids = json.loads(task.agent_tool)
-        tools = ToolsController.get_tools_list_as_tool_instance(
-            db=db, tool_ids=tool_ids
-        )
-
-        prompt = get_desc_prompt(
-            agent=agent,
-            agent_instruction=task.agent_instruction,
-            previous_output=previous_output,
-            doc_context=doc_context,
-            params=params,
-        )
-
-        init_task = CustomAgent(
-            agent=agent,
-            agent_instruction=prompt,
-            agent_output=task.agent_output,
-            tools=tools,
-            params=task_params,
-        )
-
-        custom_task_output, comment_task_output = async_to_sync(init_task.main)()
-
-        max_length = max(len(v) for v in custom_task_output.json_dict.values())
-
-        # Handle the edge cases in which if we do get empty column
-        for key in custom_task_output.json_dict.keys():
-            custom_task_output.json_dict[key] += [None] * (
-                max_length - len(custom_task_output.json_dict[key])
-            )
-
-        full_file_url = None
-        if is_csv:
-            file_name = f"task_output/{get_uuid()}.csv"
-            csv_data = pd.DataFrame(custom_task_output.json_dict)
-            buffer = io.StringIO()
-            csv_data.to_csv(buffer, index=False)
-            buffer.seek(0)
-            s3_client.put_object(
-                Bucket=Config.S3_BUCKET_NAME,
-                Key=file_name,
-                Body=buffer.getvalue(),  # Use the CSV content from the buffer
-                ContentType="text/csv",
-            )
-            # csv_data = pd.DataFrame(custom_task_output.json_dict).to_csv(
-            #     "static/" + file_name, index=False
-            # )
-            # full_file_url = f"static/{file_name}"
-            full_file_url = f"https://{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION_NAME}.amazonaws.com/{file_name}"
-
-            # s3_client.put_object(
-            #     Bucket=Config.S3_BUCKET_NAME,
-            #     Key=file_name,
-            #     Body=csv_data,
-            #     ContentType="text/csv",
-            # )
-        TaskCompletedController.update_completed_task_details(
+        execute_agent_task(
             db=db,
+            agent_id=agent_id,
+            task_id=task_id,
+            previous_output=previous_output,
+            is_csv=is_csv,
             completed_task_id=completed_task_id,
-            output=custom_task_output.raw,
-            comment=comment_task_output.raw,
-            file_path=full_file_url,
-            status=1,
-            mark_as=1,
-            success=True
+            defer_duplicate=self.request.retries < task_result_cache.max_retries,
         )
         db.close()
 
         return f"Task completed: {task_id}, Completed Task Id: {completed_task_id}"
+    except TaskInFlight:
+        db.close()
+        logger_set.info(f"Identical task running, retrying later. Task Id: {task_id}")
+        raise self.retry(
+            countdown=task_result_cache.retry_countdown,
+            max_retries=task_result_cache.max_retries,
+        )
     except NoCredentialsError as e:
         logger_set.info(f"Celery task failed. Task Id: {task_id}. Error: {str(e)}")
 
@@ -179,18 +304,75 @@ def task_creation_celery(
         )
         return f"Task failed: {task_id}, Completed Task Id: {completed_task_id}"
 
+def schedule_workflow_tasks(run_id: str, task_ids: list[int]) -> None:
+    """Enqueue the ready tasks of a workflow run as one group."""
+    if task_ids:
+        group(run_workflow_task.s(run_id, task_id) for task_id in task_ids).apply_async()
+
+
+@celery_app.task(bind=True)
+def run_workflow_task(self, run_id: str, task_id: int) -> str:
+    """
+    Run one task of a workflow run. The outputs of its dependencies are read
+    from the run, and once it finishes the dependents it unblocked are
+    scheduled in parallel. When it fails, everything downstream is marked as
+    failed instead of being run.
+    """
+    run = WorkflowRun(run_id)
+    completed_task_id = run.completed_task_id(task_id)
+    # Redelivered after the task finished, its dependents were already scheduled
+    if run.is_completed(task_id):
+        return f"Task already completed: {task_id}, Completed Task Id: {completed_task_id}"
+
+    db = next(get_db_session())
+    try:
+        logger_set.info(f"Workflow task started. Run Id: {run_id}, Task Id: {task_id}")
+        task, output = execute_agent_task(
+            db=db,
+            agent_id=run.agent_id(task_id),
+            task_id=task_id,
+            previous_output=run.outputs(run.dependencies(task_id)),
+            is_csv=run.is_csv,
+            completed_task_id=completed_task_id,
+            defer_duplicate=self.request.retries < task_result_cache.max_retries,
+        )
+        schedule_workflow_tasks(
+            run_id, run.complete(task_id, TaskUtils.format_output(task, output))
+        )
+
+        return f"Task completed: {task_id}, Completed Task Id: {completed_task_id}"
+    except TaskInFlight:
+        logger_set.info(
+            f"Identical task running, retrying later. Run Id: {run_id}, Task Id: {task_id}"
+        )
+        raise self.retry(
+            countdown=task_result_cache.retry_countdown,
+            max_retries=task_result_cache.max_retries,
+        )
+    except Exception as e:
+        logger_set.info(
+            f"Workflow task failed. Run Id: {run_id}, Task Id: {task_id}. Error: {str(e)}"
+        )
+        TaskCompletedController.mark_completed_tasks_failed(
+            db=db,
+            completed_task_ids=[completed_task_id]
+            + [run.completed_task_id(id) for id in run.downstream(task_id)],
+        )
+        return f"Task failed: {task_id}, Completed Task Id: {completed_task_id}"
+    finally:
+        db.close()
+
+
 @celery_app.task()
 def reassign_task_ctrl(completed_task_id: int):
     task_id:int
-    try:
-        db = next(get_db_session())
-    except Exception as e:
-        time.sleep(1)
-        db = next(get_db_session())
+    db = next(get_db_session())
     try:
 
-        completed_task = TaskCompletedController.get_completed_task_details_by_id(db=db, id=completed_task_id)
-        task = TaskController.get_tasks_by_id_ctrl(db=db, id=completed_task.task_id)
+        # Completed task, its parent task and the previous output in one query
+        [(completed_task, task)] = TaskUtils.load_previous_outputs(
+            db=db, completed_task_ids=[completed_task_id]
+        )
         agent = AgentController.get_agents_by_id_ctrl(db, task.assign_task_agent_id)
 
         task_params = {}
@@ -228,9 +410,7 @@ def reassign_task_ctrl(completed_task_id: int):
                 query=task.agent_instruction, score_threshold=0.2
             )
         
-        previous_output = TaskUtils.get_previous_outputs_by_completed_task(
-                db=db, previous_outputs=[completed_task_id]
-            )
+        previous_output = [TaskUtils.format_previous_output(completed_task, task)]
         tool_ids = json.loads(task.agent_tool)
         tools = ToolsController.get_tools_list_as_tool_instance(
             db=db, tool_ids=tool_ids
@@ -252,7 +432,9 @@ def reassign_task_ctrl(completed_task_id: int):
             params=task_params,
         )
 
-        custom_task_output, comment_task_output = async_to_sync(init_task.main)()
+        custom_task_output, comment_task_output = run_custom_agent(
+            init_task, completed_task_id
+        )
 
         completed_task_details = TaskCompletedController.update_completed_task_details_with_marked_as(
             db=db,
@@ -266,11 +448,12 @@ def reassign_task_ctrl(completed_task_id: int):
         )
         task_ser = completed_task_serializer(tasks=completed_task_details)
 
-        for i, task in enumerate(task_ser):
-            file = TaskCompletedFileController.get_completed_file_details(
-                db=db, completed_task_id=task["id"]
-            )
-            task_ser[i]["urls"] = completed_task_file_serializer(file) if file else []
+        files = TaskCompletedFileController.get_completed_files_by_completed_task_ids(
+            db=db, completed_task_ids=[task["id"] for task in task_ser]
+        )
+        for task in task_ser:
+            task_files = files.get(task["id"])
+            task["urls"] = completed_task_file_serializer(task_files) if task_files else []
 
         logger_set.info("Task reassigned successfully completed.")
         db.close()
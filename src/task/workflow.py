@@ -0,0 +1,226 @@
+import json
+import uuid
+from collections import defaultdict
+from fastapi import HTTPException
+from src.config import Config
+from src.task.models import Tasks
+from src.utils.cache import get_redis
+
+PREVIOUS_OUTPUT_ENABLED = {"1", "true", "on", "yes"}
+
+
+def uses_previous_output(task: Tasks) -> bool:
+    return str(task.prev_output_checkbox or "").strip().lower() in PREVIOUS_OUTPUT_ENABLED
+
+
+def build_task_graph(tasks: list[Tasks]) -> dict[int, list[int]]:
+    """
+    Dependencies (task id -> ids of the tasks it waits for) of the tasks of a
+    workflow.
+
+    A task depends on its parent_task_id, and a task with the previous output
+    checkbox set depends on every task of the closest lower task_arrange. All
+    other tasks are independent and can run in parallel.
+    """
+    ids = {task.id for task in tasks}
+    by_arrange = defaultdict(list)
+    for task in tasks:
+        by_arrange[task.task_arrange].append(task.id)
+    arranges = sorted(by_arrange)
+
+    graph = {}
+    for task in tasks:
+        dependencies = set()
+        if task.parent_task_id in ids and task.parent_task_id != task.id:
+            dependencies.add(task.parent_task_id)
+
+        if uses_previous_output(task):
+            lower = [arrange for arrange in arranges if arrange < task.task_arrange]
+            if lower:
+                dependencies.update(by_arrange[lower[-1]])
+
+        graph[task.id] = sorted(dependencies)
+
+    return graph
+
+
+def topological_levels(graph: dict[int, list[int]]) -> list[list[int]]:
+    """
+    Group the tasks by depth: every task of a level only depends on tasks of
+    earlier levels. The number of levels is the length of the critical path.
+
+    Raises:
+        HTTPException: If the dependencies contain a cycle.
+    """
+    remaining = {id: len(dependencies) for id, dependencies in graph.items()}
+    dependents = get_dependents(graph)
+
+    levels = []
+    ready = sorted(id for id, count in remaining.items() if count == 0)
+    while ready:
+        levels.append(ready)
+        next_ready = []
+        for id in ready:
+            for dependent in dependents[id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    next_ready.append(dependent)
+        ready = sorted(next_ready)
+
+    if sum(len(level) for level in levels) != len(graph):
+        raise HTTPException(
+            detail="Workflow tasks have a dependency cycle", status_code=400
+        )
+
+    return levels
+
+
+def get_dependents(graph: dict[int, list[int]]) -> dict[int, list[int]]:
+    dependents = {id: [] for id in graph}
+    for id, dependencies in graph.items():
+        for dependency in dependencies:
+            dependents[dependency].append(id)
+
+    return dependents
+
+
+class WorkflowRun:
+    """
+    Shared state of one workflow run in Redis.
+
+    The run keeps the dependency graph, the agent and completed task id of
+    every task, a counter of unfinished dependencies per task and the output of
+    every finished task. Finishing a task stores its output and decrements the
+    counters of its dependents in one atomic script, the dependents whose
+    counter reaches zero are ready to run and read the outputs they need from
+    the run instead of MySQL. A task is recorded once: completing it again
+    (e.g. a redelivered Celery task) decrements nothing and readies nothing.
+    """
+
+    # KEYS: outputs, pending. ARGV: task id, output, ttl, dependent ids
+    COMPLETE_SCRIPT = """
+    if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+        return {}
+    end
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    local ready = {}
+    for i = 4, #ARGV do
+        if redis.call('HINCRBY', KEYS[2], ARGV[i], -1) == 0 then
+            table.insert(ready, ARGV[i])
+        end
+    end
+    return ready
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self._meta = None
+
+    @classmethod
+    def start(
+        cls,
+        workflow_id: int,
+        graph: dict[int, list[int]],
+        agent_ids: dict[int, int],
+        completed_task_ids: dict[int, int],
+        is_csv: bool = False,
+    ) -> "WorkflowRun":
+        run = cls(uuid.uuid4().hex)
+        run._meta = {
+            "workflow_id": workflow_id,
+            "graph": {str(id): dependencies for id, dependencies in graph.items()},
+            "agent_ids": {str(id): agent_id for id, agent_id in agent_ids.items()},
+            "completed_task_ids": {
+                str(id): completed_task_id
+                for id, completed_task_id in completed_task_ids.items()
+            },
+            "is_csv": is_csv,
+        }
+
+        pipeline = get_redis().pipeline()
+        pipeline.set(run._key("meta"), json.dumps(run._meta), ex=Config.WORKFLOW_RUN_TTL)
+        pending = {id: len(dependencies) for id, dependencies in graph.items()}
+        if pending:
+            pipeline.hset(run._key("pending"), mapping=pending)
+            pipeline.expire(run._key("pending"), Config.WORKFLOW_RUN_TTL)
+        pipeline.execute()
+
+        return run
+
+    @property
+    def meta(self) -> dict:
+        if self._meta is None:
+            meta = get_redis().get(self._key("meta"))
+            if meta is None:
+                raise HTTPException(
+                    detail=f"Workflow run not found: {self.run_id}", status_code=404
+                )
+            self._meta = json.loads(meta)
+
+        return self._meta
+
+    @property
+    def graph(self) -> dict[int, list[int]]:
+        return {int(id): dependencies for id, dependencies in self.meta["graph"].items()}
+
+    @property
+    def is_csv(self) -> bool:
+        return self.meta["is_csv"]
+
+    def roots(self) -> list[int]:
+        return [id for id, dependencies in self.graph.items() if not dependencies]
+
+    def dependencies(self, task_id: int) -> list[int]:
+        return self.meta["graph"][str(task_id)]
+
+    def agent_id(self, task_id: int) -> int:
+        return self.meta["agent_ids"][str(task_id)]
+
+    def completed_task_id(self, task_id: int) -> int:
+        return self.meta["completed_task_ids"][str(task_id)]
+
+    def outputs(self, task_ids: list[int]) -> list[str]:
+        """Outputs of finished tasks, in the order of task_ids."""
+        if not task_ids:
+            return []
+
+        values = get_redis().hmget(self._key("outputs"), task_ids)
+        return [value.decode("utf-8") for value in values if value is not None]
+
+    def is_completed(self, task_id: int) -> bool:
+        return bool(get_redis().hexists(self._key("outputs"), task_id))
+
+    def complete(self, task_id: int, output: str) -> list[int]:
+        """
+        Store the output of task_id and return the dependents this call made
+        ready. Empty if task_id was already completed.
+        """
+        dependents = get_dependents(self.graph)[task_id]
+
+        ready = get_redis().eval(
+            self.COMPLETE_SCRIPT,
+            2,
+            self._key("outputs"),
+            self._key("pending"),
+            task_id,
+            output,
+            Config.WORKFLOW_RUN_TTL,
+            *dependents,
+        )
+        return [int(dependent) for dependent in ready]
+
+    def downstream(self, task_id: int) -> list[int]:
+        """Every task that directly or transitively depends on task_id."""
+        dependents = get_dependents(self.graph)
+        found = []
+        stack = list(dependents[task_id])
+        while stack:
+            id = stack.pop()
+            if id not in found:
+                found.append(id)
+                stack.extend(dependents[id])
+
+        return found
+
+    def _key(self, name: str) -> str:
+        return f"workflow_run:{self.run_id}:{name}"
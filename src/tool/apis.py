@@ -1,6 +1,7 @@
 import logging
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db_session
+from database import get_async_db_session, get_db_session
 from src.utils.logger import logger_set
 from fastapi.responses import JSONResponse
 from src.tool.controllers import ToolsController, insert_if_all_listed_tools_does_not_exist
@@ -62,19 +63,16 @@ def update_tools(
 
 
 @router.get("")
-async def get_tools(request: Request):
+async def get_tools(
+    request: Request, db: AsyncSession = Depends(get_async_db_session)
+):
     try:
-        try:
-            db = next(get_db_session())
-        except :
-            db = next(get_db_session())
-
         id = request.query_params.get("id")
 
         if id:
-            tools = ToolsController.get_tool_by_uuid(db=db, id=id)
+            tools = await ToolsController.get_tool_by_uuid_async(db=db, id=id)
         else:
-            tools = ToolsController.get_all_tools(db)
+            tools = await ToolsController.get_all_tools_async(db)
 
         tools_json = get_tools_serializer(tools=tools)
         logger_set.info(f"Tools listed")
@@ -1,8 +1,10 @@
 import json
 from datetime import datetime
 from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.crew.tools import ToolKit
+from src.crew.tools import ToolKit, get_tool
 from src.tool.models import Tools
 from database import db
 import logging
@@ -12,6 +14,11 @@ from src.utils.utils import get_uuid
 logging.config.fileConfig("logging.conf", disable_existing_loggers=False)
 logger = logging.getLogger(__name__)
 
+TOOLKIT_NAMES = ToolKit.names()
+
+# Tool uuid -> tool name, shared by every task run in this process
+_tool_name_cache: dict[str, str] = {}
+
 
 def validate_tool_parameters(parameters: str) -> bool:
     """
@@ -45,8 +52,7 @@ def insert_if_all_listed_tools_does_not_exist():
                 "uuid": get_uuid(),
                 "app": tool,
                 "status": True,
-                "parameters": json.dumps(eval(f"ToolKit.{tool}.value[1]")),
-                "meta_name": json.dumps(eval(f"ToolKit.{tool}.value[3]")),
+                "parameters": json.dumps(ToolKit[tool].parameters),
             }
             ToolsController.create_tool(db, payload)
 
@@ -73,6 +79,7 @@ class ToolsController:
     @staticmethod
     def update_tools(db: Session, id: str, payload: dict) -> Tools:
         tool = ToolsController.get_tool_by_uuid(db, id)
+        _tool_name_cache.pop(id, None)
         payload.update({"updated_at": datetime.now()})
         # update provided fields
         for field, value in payload.items():
@@ -93,6 +100,22 @@ class ToolsController:
         else:
             return []
 
+    @staticmethod
+    async def get_all_tools_async(db: AsyncSession) -> list[Tools]:
+        result = await db.execute(select(Tools))
+
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_tool_by_uuid_async(db: AsyncSession, id: str) -> Tools:
+        result = await db.execute(select(Tools).filter(Tools.uuid == id))
+        tool = result.scalars().first()
+
+        if tool:
+            return tool
+
+        raise HTTPException(detail="Tool not found", status_code=404)
+
     @staticmethod
     def get_tool_by_uuid(db: Session, id: str) -> Tools:
         tool = db.query(Tools).filter(Tools.uuid == id).first()
@@ -103,31 +126,42 @@ class ToolsController:
         raise HTTPException(detail="Tool not found", status_code=404)
 
     @staticmethod
-    def get_tools_list_as_tool_instance(db: Session, tool_ids: list) -> tuple:
-        tools = []
-        # webhook_urls = []
-        existing_tools = [tool_name.name for tool_name in ToolKit]
+    def get_tools_by_uuids(db: Session, ids: list[str]) -> list[Tools]:
+        tools = db.query(Tools).filter(Tools.uuid.in_(set(ids))).all()
+
+        found = {tool.uuid for tool in tools}
+        missing = [id for id in ids if id not in found]
+        if missing:
+            raise HTTPException(
+                detail=f"Tool not found: {', '.join(missing)}", status_code=404
+            )
 
+        return tools
+
+    @staticmethod
+    def get_tools_list_as_tool_instance(db: Session, tool_ids: list) -> list:
+        """
+        Resolve tool uuids to tool instances.
+
+        Uuids not seen before by this process are loaded with a single IN query,
+        after that resolution is a dict lookup. The uuid -> tool_name cache is
+        invalidated by update_tools; tool_name itself is never updated, so
+        entries cached in other processes stay valid.
+        """
+        tool_ids = [id for id in tool_ids if id]
+        uncached = [id for id in tool_ids if id not in _tool_name_cache]
+
+        if uncached:
+            for tool in ToolsController.get_tools_by_uuids(db=db, ids=uncached):
+                _tool_name_cache[tool.uuid] = tool.tool_name
+
+        tools = []
         for id in tool_ids:
-            if id:
-                tool = ToolsController.get_tool_by_uuid(db=db, id=id)
-                tool_name = tool.tool_name
-                # if tool.webhook_url:
-                #     webhook_url = f"WEBHOOK URL OF {tool_name}: " + tool.webhook_url
-                #     webhook_urls.append(webhook_url)
-
-                if tool_name not in existing_tools:
-                    raise HTTPException(
-                        detail=f"Tool {tool_name} not found", status_code=404
-                    )
-                tools.append(eval(f"ToolKit.{tool_name}.value[0]"))
-                # required_params = eval(f"ToolKit.{tool_name}.value[1]")
-
-                # if required_params:
-                #     keys = list(required_params.keys())
-
-                #     for i in keys:
-                #         var = f"{i} = {{{i}}},"
-                #         params = params + var
-
-        return tools  # , webhook_urls
+            tool_name = _tool_name_cache[id]
+            if tool_name not in TOOLKIT_NAMES:
+                raise HTTPException(
+                    detail=f"Tool {tool_name} not found", status_code=404
+                )
+            tools.append(get_tool(tool_name))
+
+        return tools
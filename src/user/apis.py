@@ -1,7 +1,8 @@
 from datetime import datetime
 import logging
-from sqlalchemy.orm import Session
-from database import get_db_session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db_session
 from src.task.models import User
 from src.user.serializers import (
     UserAttributeCreateSchema,
@@ -22,19 +23,19 @@ router = APIRouter()
 async def create_user_attribute(
     request: Request,
     user_attribute: UserAttributeCreateSchema,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
 ):
     try:
         # Check if the user exists
-        user = db.query(User).filter(User.id == user_attribute.user_id).first()
+        user = await db.scalar(select(User.id).filter(User.id == user_attribute.user_id))
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         # Check if UserAttribute already exists for the given user_id
-        existing_user_attribute = (
-            db.query(UserAttribute)
-            .filter(UserAttribute.user_id == user_attribute.user_id)
-            .first()
+        existing_user_attribute = await db.scalar(
+            select(UserAttribute.id).filter(
+                UserAttribute.user_id == user_attribute.user_id
+            )
         )
         if existing_user_attribute:
             raise HTTPException(status_code=400, detail="User attribute already exists")
@@ -49,10 +50,10 @@ async def create_user_attribute(
 
         # Add the new UserAttribute to the session and commit
         db.add(new_user_attribute)
-        db.commit()
+        await db.commit()
 
         # Optionally, refresh the object to reflect its data after the commit
-        db.refresh(new_user_attribute)
+        await db.refresh(new_user_attribute)
         data = get_user_attributes_serializer(new_user_attribute)
         # Return a structured JSON response with success status
         return JSONResponse(
@@ -93,16 +94,18 @@ async def create_user_attribute(
 
 
 @router.get("", response_model=UserAttributeCreateSchema)
-async def get_user_attribute(user_id: int, db: Session = Depends(get_db_session)):
+async def get_user_attribute(
+    user_id: int, db: AsyncSession = Depends(get_async_db_session)
+):
     try:
         # Check if the user exists
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.scalar(select(User.id).filter(User.id == user_id))
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         # Query the UserAttribute table for the user_id
-        user_attribute = (
-            db.query(UserAttribute).filter(UserAttribute.user_id == user_id).first()
+        user_attribute = await db.scalar(
+            select(UserAttribute).filter(UserAttribute.user_id == user_id)
         )
 
         if not user_attribute:
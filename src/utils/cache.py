@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+import redis
+import redis.asyncio as async_redis
+from src.config import Config
+
+_redis_client = None
+_async_redis_client = None
+
+
+def get_redis() -> redis.Redis:
+    """Process wide Redis client on Config.REDIS_URL (connection pooled)."""
+    global _redis_client
+
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            Config.REDIS_URL, socket_timeout=Config.REDIS_CACHE_TIMEOUT
+        )
+
+    return _redis_client
+
+
+def get_async_redis() -> async_redis.Redis:
+    """Process wide asyncio Redis client on Config.REDIS_URL."""
+    global _async_redis_client
+
+    if _async_redis_client is None:
+        _async_redis_client = async_redis.Redis.from_url(
+            Config.REDIS_URL, socket_timeout=Config.REDIS_CACHE_TIMEOUT
+        )
+
+    return _async_redis_client
+
+
+class TTLCache:
+    """
+    Thread safe in-process LRU cache whose entries expire ttl seconds after
+    they were set. A ttl of None keeps entries until they are evicted.
+    """
+
+    def __init__(self, maxsize: int, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_matching(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove every entry whose key matches predicate, returns the count."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteStore:
+    """
+    Persistent key/value store (str -> bytes) in a local SQLite file.
+
+    Entries optionally expire after ttl seconds and the store is bounded to
+    max_entries, evicting the least recently used entries. Safe to share
+    between threads; every process opens its own connection.
+    """
+
+    EVICT_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int, ttl: float = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS store ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "accessed_at REAL NOT NULL, expires_at REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS store_accessed_at ON store (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+
+        return self._conn
+
+    def mget(self, keys: list[str]) -> list[Optional[bytes]]:
+        if not keys:
+            return []
+
+        now = time.time()
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value FROM store WHERE key IN ({placeholders}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    [*chunk, now],
+                ).fetchall()
+                found.update(rows)
+                if rows:
+                    conn.execute(
+                        "UPDATE store SET accessed_at = ? WHERE key IN "
+                        f"({','.join('?' * len(rows))})",
+                        [now, *(key for key, _ in rows)],
+                    )
+            conn.commit()
+
+        return [found.get(key) for key in keys]
+
+    def mset(self, items: Iterable[tuple[str, bytes]]) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        rows = [(key, value, now, expires_at) for key, value in items]
+        if not rows:
+            return
+
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO store (key, value, accessed_at, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._writes += len(rows)
+            if self._writes >= self.EVICT_EVERY:
+                self._writes = 0
+                self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute(
+            "DELETE FROM store WHERE expires_at IS NOT NULL AND expires_at <= ?", [now]
+        )
+        (count,) = conn.execute("SELECT COUNT(*) FROM store").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM store WHERE key IN "
+                "(SELECT key FROM store ORDER BY accessed_at LIMIT ?)",
+                [count - self.max_entries],
+            )
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.mget([key])[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        self.mset([(key, value)])
+
+    def delete(self, keys: list[str]) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.executemany("DELETE FROM store WHERE key = ?", [(key,) for key in keys])
+            conn.commit()
@@ -0,0 +1,113 @@
+import hashlib
+from array import array
+from typing import Optional
+from langchain_core.embeddings import Embeddings
+from src.config import Config
+from src.utils.cache import SQLiteStore, get_redis
+from src.utils.logger import logger_set
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that only sends texts it has not embedded before to
+    the underlying model.
+
+    Vectors are keyed by a hash of (model, text) and stored in a local SQLite
+    file (LRU bounded) and, optionally, in Redis so workers share them.
+    Queries and document chunks use the same keys, so a chunk embedded at
+    ingestion also serves an identical query.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model: str,
+        store: Optional[SQLiteStore] = None,
+        use_redis: bool = Config.EMBEDDING_CACHE_REDIS,
+        redis_ttl: int = Config.EMBEDDING_CACHE_REDIS_TTL,
+    ):
+        self.underlying = underlying
+        self.model = model
+        self.store = store
+        self.use_redis = use_redis
+        self.redis_ttl = redis_ttl
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+        return f"embedding:{digest}"
+
+    @staticmethod
+    def _encode(vector: list[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _decode(value: bytes) -> list[float]:
+        vector = array("f")
+        vector.frombytes(value)
+        return vector.tolist()
+
+    def _lookup(self, keys: list[str]) -> list[Optional[bytes]]:
+        values = self.store.mget(keys) if self.store else [None] * len(keys)
+
+        missing = [i for i, value in enumerate(values) if value is None]
+        if missing and self.use_redis:
+            try:
+                redis_values = get_redis().mget([keys[i] for i in missing])
+            except Exception as e:
+                logger_set.error(f"Embedding cache read failed : {e}")
+                redis_values = [None] * len(missing)
+
+            promoted = []
+            for i, value in zip(missing, redis_values):
+                if value is not None:
+                    values[i] = value
+                    promoted.append((keys[i], value))
+            if promoted and self.store:
+                self.store.mset(promoted)
+
+        return values
+
+    def _save(self, items: list[tuple[str, bytes]]) -> None:
+        if self.store:
+            self.store.mset(items)
+
+        if self.use_redis:
+            try:
+                pipeline = get_redis().pipeline(transaction=False)
+                for key, value in items:
+                    pipeline.set(key, value, ex=self.redis_ttl)
+                pipeline.execute()
+            except Exception as e:
+                logger_set.error(f"Embedding cache write failed : {e}")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(text) for text in texts]
+        values = self._lookup(keys)
+
+        # Embed every distinct missing text once
+        missing = {}
+        for key, text, value in zip(keys, texts, values):
+            if value is None:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            new_values = {
+                key: self._encode(vector) for key, vector in zip(missing, vectors)
+            }
+            self._save(list(new_values.items()))
+            values = [
+                value if value is not None else new_values[key]
+                for key, value in zip(keys, values)
+            ]
+
+        return [self._decode(value) for value in values]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        [value] = self._lookup([key])
+        if value is None:
+            value = self._encode(self.underlying.embed_query(text))
+            self._save([(key, value)])
+
+        return self._decode(value)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+from typing import Any, Iterable, Optional
+from crewai.llm import LLM
+from src.config import Config
+from src.utils.cache import SQLiteStore, get_redis
+from src.utils.logger import logger_set
+
+
+class LLMCache:
+    """
+    Cache of LLM completions keyed by a hash of (model, messages, params).
+
+    Completions are stored in a local SQLite file (LRU bounded, expiring after
+    ttl seconds) and, optionally, in Redis so workers share them. Only the
+    agent roles listed in roles use the cache, "*" enables it for every role.
+    """
+
+    ALL_ROLES = "*"
+
+    def __init__(
+        self,
+        store: Optional[SQLiteStore] = None,
+        roles: Iterable[str] = (),
+        use_redis: bool = Config.LLM_CACHE_REDIS,
+        ttl: int = Config.LLM_CACHE_TTL,
+    ):
+        self.store = store
+        self.roles = {role.strip().lower() for role in roles if role.strip()}
+        self.use_redis = use_redis
+        self.ttl = ttl
+
+    def enabled_for(self, role: str) -> bool:
+        return self.ALL_ROLES in self.roles or (role or "").strip().lower() in self.roles
+
+    @staticmethod
+    def make_key(model: str, messages: list[dict], params: dict) -> str:
+        payload = json.dumps([model, messages, params], sort_keys=True, default=str)
+        return f"llm:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.store.get(key) if self.store else None
+
+        if value is None and self.use_redis:
+            try:
+                value = get_redis().get(key)
+            except Exception as e:
+                logger_set.error(f"LLM cache read failed : {e}")
+            if value is not None and self.store:
+                self.store.set(key, value)
+
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, response: str) -> None:
+        value = response.encode("utf-8")
+        if self.store:
+            self.store.set(key, value)
+
+        if self.use_redis:
+            try:
+                get_redis().set(key, value, ex=self.ttl or None)
+            except Exception as e:
+                logger_set.error(f"LLM cache write failed : {e}")
+
+
+class CachedLLM(LLM):
+    """
+    crewAI LLM that answers repeated calls from an LLMCache instead of the
+    provider. crewAI turns any other client (e.g. ChatOpenAI) given to an agent
+    into its own LLM, so the cache has to sit at this level.
+    """
+
+    def __init__(self, model: str, cache: LLMCache, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.cache = cache
+
+    def _params(self) -> dict[str, Any]:
+        params = {
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "n": self.n,
+            # Agents merge their stop words through a set, order is arbitrary
+            "stop": sorted(self.stop) if isinstance(self.stop, list) else self.stop,
+            "max_tokens": self.max_tokens or self.max_completion_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "logit_bias": self.logit_bias,
+            "response_format": self.response_format,
+            "seed": self.seed,
+            **self.kwargs,
+        }
+        return {name: value for name, value in params.items() if value is not None}
+
+    def call(self, messages: list[dict[str, str]], callbacks: list[Any] = []) -> str:
+        key = self.cache.make_key(self.model, messages, self._params())
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+
+        response = super().call(messages, callbacks)
+        if response:
+            self.cache.set(key, response)
+
+        return response
+
+
+llm_cache = LLMCache(
+    store=SQLiteStore(
+        path=Config.LLM_CACHE_PATH,
+        max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+        ttl=Config.LLM_CACHE_TTL or None,
+    ),
+    roles=Config.LLM_CACHE_ROLES.split(","),
+)
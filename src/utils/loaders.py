@@ -0,0 +1,206 @@
+import codecs
+import json
+from typing import Callable, Dict, Iterator
+from langchain_core.documents.base import Document
+
+# File type (extension) -> loader factory taking the file path. Every loader
+# exposes lazy_load() yielding documents one at a time.
+LOADERS: Dict[str, Callable] = {}
+
+
+def register_loader(*file_types: str) -> Callable:
+    """Register the decorated loader factory for the given file types."""
+
+    def decorator(factory: Callable) -> Callable:
+        for file_type in file_types:
+            LOADERS[file_type] = factory
+        return factory
+
+    return decorator
+
+
+def supported_file_types() -> list[str]:
+    return sorted(LOADERS)
+
+
+def is_supported_file_type(file_type: str) -> bool:
+    return file_type in LOADERS
+
+
+def get_loader(file_path: str, file_type: str):
+    """Instantiate the loader registered for file_type."""
+    factory = LOADERS.get(file_type)
+    if not factory:
+        raise ValueError(
+            f"Unsupported file type: {file_type}. Supported types: {supported_file_types()}"
+        )
+
+    return factory(file_path)
+
+
+@register_loader("csv")
+def csv_loader(file_path: str):
+    from langchain_community.document_loaders import CSVLoader
+
+    return CSVLoader(file_path)
+
+
+@register_loader("pdf")
+def pdf_loader(file_path: str):
+    from langchain_community.document_loaders import PyPDFLoader
+
+    return PyPDFLoader(file_path)
+
+
+@register_loader("txt")
+class TextBlockLoader:
+    """
+    Loads a text file as a sequence of documents of roughly block_size
+    characters, cut at line boundaries, instead of reading it whole.
+    """
+
+    def __init__(
+        self, file_path: str, block_size: int = 64 * 1024, encoding: str = "utf-8"
+    ):
+        self.file_path = file_path
+        self.block_size = block_size
+        self.encoding = encoding
+
+    def lazy_load(self) -> Iterator[Document]:
+        block = []
+        size = 0
+        with open(self.file_path, encoding=self.encoding) as file:
+            for line in file:
+                block.append(line)
+                size += len(line)
+                if size >= self.block_size:
+                    yield self._document(block)
+                    block = []
+                    size = 0
+
+        if block:
+            yield self._document(block)
+
+    def _document(self, lines: list[str]) -> Document:
+        return Document(page_content="".join(lines), metadata={"source": self.file_path})
+
+
+@register_loader("md", "markdown")
+class MarkdownLoader(TextBlockLoader):
+    """
+    Loads a markdown file section by section. A new document starts at every
+    heading, and sections longer than block_size are cut at line boundaries.
+    """
+
+    def lazy_load(self) -> Iterator[Document]:
+        block = []
+        size = 0
+        heading = ""
+        in_code = False
+        with open(self.file_path, encoding=self.encoding) as file:
+            for line in file:
+                if line.lstrip().startswith("```"):
+                    in_code = not in_code
+                is_heading = not in_code and line.startswith("#")
+                if block and (is_heading or size >= self.block_size):
+                    yield self._section(block, heading)
+                    block = []
+                    size = 0
+                if is_heading:
+                    heading = line.strip("# \r\n")
+                block.append(line)
+                size += len(line)
+
+        if block:
+            yield self._section(block, heading)
+
+    def _section(self, lines: list[str], heading: str) -> Document:
+        document = self._document(lines)
+        if heading:
+            document.metadata["heading"] = heading
+        return document
+
+
+@register_loader("json")
+class JSONRecordLoader:
+    """
+    Streams a JSON file one record at a time with an incremental parser, so
+    large files are never parsed whole. The records are the items of a top
+    level array, or the values of a top level object (keyed by "key").
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def lazy_load(self) -> Iterator[Document]:
+        import ijson
+
+        with open(self.file_path, "rb") as file:
+            if self._first_char(file) == b"[":
+                records = enumerate(ijson.items(file, "item", use_float=True))
+                for index, record in records:
+                    yield self._document(record, {"record": index})
+            else:
+                for key, record in ijson.kvitems(file, "", use_float=True):
+                    yield self._document(record, {"key": key})
+
+    @staticmethod
+    def _first_char(file) -> bytes:
+        """
+        First non whitespace byte of the file. The file is left positioned at
+        the start of the JSON text, past any UTF-8 byte order mark.
+        """
+        if file.read(3) != codecs.BOM_UTF8:
+            file.seek(0)
+        start = file.tell()
+        char = file.read(1)
+        while char.isspace():
+            char = file.read(1)
+        file.seek(start)
+        return char
+
+    def _document(self, record, metadata: dict) -> Document:
+        if not isinstance(record, str):
+            record = json.dumps(record, ensure_ascii=False)
+        return Document(
+            page_content=record, metadata={"source": self.file_path, **metadata}
+        )
+
+
+@register_loader("jsonl", "ndjson")
+class JSONLinesLoader(JSONRecordLoader):
+    """Loads a JSON lines file, one document per non empty line."""
+
+    def lazy_load(self) -> Iterator[Document]:
+        with open(self.file_path, encoding="utf-8-sig") as file:
+            for line_number, line in enumerate(file, start=1):
+                line = line.strip()
+                if line:
+                    yield self._document(json.loads(line), {"line": line_number})
+
+
+@register_loader("docx")
+class DocxLoader(TextBlockLoader):
+    """
+    Loads a Word document as documents of roughly block_size characters, cut
+    at paragraph boundaries.
+    """
+
+    def lazy_load(self) -> Iterator[Document]:
+        import docx
+
+        block = []
+        size = 0
+        for paragraph in docx.Document(self.file_path).paragraphs:
+            text = paragraph.text
+            if not text.strip():
+                continue
+            block.append(text + "\n")
+            size += len(text) + 1
+            if size >= self.block_size:
+                yield self._document(block)
+                block = []
+                size = 0
+
+        if block:
+            yield self._document(block)
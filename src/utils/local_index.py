@@ -0,0 +1,225 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import Iterable, Optional, Sequence
+import numpy as np
+from src.config import Config
+
+
+class LocalVectorIndex:
+    """
+    Exact cosine similarity index of one namespace on local disk.
+
+    The unit normalized vectors are stored as a float32 .npy matrix that is
+    memory mapped for search, next to a JSON file with the id, text and
+    metadata of every row. A build writes a new generation of both files and
+    then atomically swaps the CURRENT pointer, so readers in other processes
+    sharing the directory never see a half written index and pick up the new
+    generation on their next search.
+    """
+
+    POINTER = "CURRENT"
+
+    # Process wide loaded generations per directory: (generation, vectors, rows)
+    _loaded: dict[str, tuple[str, np.ndarray, list[dict]]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, namespace: str, root: str = Config.LOCAL_INDEX_PATH):
+        self.namespace = namespace
+        self.path = os.path.join(root, namespace)
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.path, self.POINTER))
+
+    def build(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Sequence[dict],
+        vectors: Iterable[Sequence[float]],
+    ) -> Optional[str]:
+        """Replace the index with the given rows, returns the new generation."""
+        if not ids:
+            self.delete()
+            return None
+
+        matrix = np.asarray(list(vectors), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+        rows = [
+            {"id": id, "text": text, "metadata": metadata}
+            for id, text, metadata in zip(ids, texts, metadatas)
+        ]
+
+        os.makedirs(self.path, exist_ok=True)
+        generation = uuid.uuid4().hex
+        np.save(os.path.join(self.path, f"vectors-{generation}.npy"), matrix)
+        with open(
+            os.path.join(self.path, f"rows-{generation}.json"), "w", encoding="utf-8"
+        ) as file:
+            json.dump(rows, file, ensure_ascii=False)
+
+        previous = self._read_pointer()
+        pointer = os.path.join(self.path, self.POINTER)
+        with open(f"{pointer}.{generation}", "w") as file:
+            file.write(generation)
+        os.replace(f"{pointer}.{generation}", pointer)
+
+        if previous:
+            self._remove_generation(previous)
+
+        return generation
+
+    def generation(self) -> Optional[str]:
+        return self._read_pointer()
+
+    def delete(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+        with self._lock:
+            self._loaded.pop(self.path, None)
+
+    def ids(self) -> list[str]:
+        loaded = self._load()
+        return [row["id"] for row in loaded[2]] if loaded else []
+
+    def count(self) -> int:
+        loaded = self._load()
+        return len(loaded[2]) if loaded else 0
+
+    def search(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        filter: Optional[dict] = None,
+        include_values: bool = False,
+    ) -> list[dict]:
+        """
+        Rows most similar to vector, best first, as dicts with id, text,
+        metadata, score (cosine similarity) and, if asked, values.
+        """
+        loaded = self._load()
+        if not loaded:
+            return []
+
+        _, vectors, rows = loaded
+        query = np.array(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+
+        scores = vectors @ query
+        if filter:
+            mask = np.array([matches_filter(row["metadata"], filter) for row in rows])
+            scores = np.where(mask, scores, -np.inf)
+
+        top_k = min(top_k, len(rows))
+        if top_k <= 0:
+            return []
+
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = []
+        for index in order:
+            if scores[index] == -np.inf:
+                break
+            result = {**rows[index], "score": float(scores[index])}
+            if include_values:
+                result["values"] = vectors[index]
+            results.append(result)
+
+        return results
+
+    def _read_pointer(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, self.POINTER)) as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> Optional[tuple[str, np.ndarray, list[dict]]]:
+        # A concurrent build may remove the generation the pointer named, in
+        # which case the pointer is read again
+        for _ in range(3):
+            generation = self._read_pointer()
+            if generation is None:
+                return None
+
+            loaded = self._loaded.get(self.path)
+            if loaded is not None and loaded[0] == generation:
+                return loaded
+
+            try:
+                with self._lock:
+                    vectors = np.load(
+                        os.path.join(self.path, f"vectors-{generation}.npy"),
+                        mmap_mode="r",
+                    )
+                    with open(
+                        os.path.join(self.path, f"rows-{generation}.json"),
+                        encoding="utf-8",
+                    ) as file:
+                        rows = json.load(file)
+                    loaded = (generation, vectors, rows)
+                    self._loaded[self.path] = loaded
+                return loaded
+            except FileNotFoundError:
+                continue
+
+        return None
+
+    def _remove_generation(self, generation: str) -> None:
+        # Readers holding the old memory map keep it valid on POSIX
+        for name in (f"vectors-{generation}.npy", f"rows-{generation}.json"):
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+
+def matches_filter(metadata: dict, filter: dict) -> bool:
+    """
+    Evaluate a Pinecone style metadata filter. Supports implicit equality,
+    $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte, $and and $or.
+    """
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator, operand in condition.items():
+                if not _compare(operator, value, operand):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+
+    return True
+
+
+def _compare(operator: str, value, operand) -> bool:
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if value is None:
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+
+    raise ValueError(f"Unsupported filter operator: {operator}")
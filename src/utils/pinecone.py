@@ -1,15 +1,27 @@
+import hashlib
+import json
+import threading
+import time
 import uuid
-from datetime import time
-from typing import Optional, List, Union
-from src.preprocessing import embeddings, splitter
+from functools import cached_property
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import Callable, Iterator, Optional, List, Union
+from src.config import Config
+from src.preprocessing import analyze, embeddings, splitter
+from src.utils.cache import get_redis
+from src.utils.local_index import LocalVectorIndex
+from src.utils.loaders import LOADERS, get_loader, supported_file_types
+from src.utils.logger import logger_set
+from src.utils.rerank import hybrid_rerank
+from src.utils.retrieval_cache import retrieval_cache
 from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
 from langchain_core.documents.base import Document
-from langchain_community.document_loaders import (
-    PyPDFLoader,
-    TextLoader,
-    CSVLoader,
-)
 
 
 class PineConeConfig:
@@ -23,13 +35,35 @@ class PineConeConfig:
         data (Any, optional): Raw data to be processed
         url (str, optional): URL or file path for document loading
         url_file_type (str, optional): Type of file to be loaded
+        backend (str, optional): "pinecone", "local" or "auto", defaults to
+            Config.VECTOR_BACKEND
+
+    The Pinecone client and index handles are shared by every instance of the
+    process, so constructing a PineConeConfig for another namespace makes no
+    control plane calls once the index is known.
+
+    With the "auto" backend a namespace of at most Config.LOCAL_INDEX_MAX_CHUNKS
+    chunks is also written to a LocalVectorIndex on ingestion and searched
+    locally from then on. The "local" backend never touches Pinecone.
     """
 
-    SUPPORTED_FILE_TYPES = {"csv", "pdf", "txt"}
+    SUPPORTED_FILE_TYPES = LOADERS.keys()
     DIMENSION = 1536
     METRIC = "cosine"
     CLOUD = "aws"
     REGION = "us-east-1"
+    TEXT_KEY = "text"
+    # Metadata that identifies a chunk besides its content. Positional fields
+    # (source, row, page, line, record) are left out, so inserting content
+    # near the top of a file does not change the ids of every later chunk.
+    CHUNK_ID_METADATA = ("heading",)
+    RETRIEVAL_MODES = {"vector", "hybrid"}
+    VECTOR_BACKENDS = {"pinecone", "local", "auto"}
+
+    # Process wide client per api key and index handle per (api key, index)
+    _clients: dict[str, Pinecone] = {}
+    _indexes: dict[tuple[str, str], object] = {}
+    _lock = threading.Lock()
 
     def __init__(
         self,
@@ -38,23 +72,106 @@ class PineConeConfig:
         namespace: Optional[str] = None,
         url: Optional[str] = None,
         url_file_type: Optional[str] = None,
+        skip_index_check: bool = Config.PINECONE_SKIP_INDEX_CHECK,
+        backend: Optional[str] = None,
     ):
         if not api_key or not index_name:
             raise ValueError("API key and index name are required")
 
+        self.backend = backend or Config.VECTOR_BACKEND
+        if self.backend not in self.VECTOR_BACKENDS:
+            raise ValueError(
+                f"Unsupported vector backend: {self.backend}. Supported backends: {self.VECTOR_BACKENDS}"
+            )
+
         self.api_key = api_key
-        self.pc = Pinecone(api_key=api_key)
+        self.pc = self._get_client(api_key)
         self.index_name = index_name
         self.namespace = namespace or str(uuid.uuid4())
         self.url = url
         self.url_file_type = url_file_type and url_file_type.lower()
+        self.skip_index_check = skip_index_check
+        self.local_index = LocalVectorIndex(self.namespace)
 
-        self._create_index_if_not_exist()
-        self.index = self.pc.Index(index_name)
-        self.vector_store = PineconeVectorStore(
-            index=self.index, embedding=embeddings, namespace=self.namespace
+    @cached_property
+    def index(self):
+        return self._get_index(self.skip_index_check)
+
+    @cached_property
+    def vector_store(self) -> PineconeVectorStore:
+        # A vector store is only a namespaced view over the shared index
+        return PineconeVectorStore(
+            index=self.index,
+            embedding=embeddings,
+            text_key=self.TEXT_KEY,
+            namespace=self.namespace,
         )
 
+    def _use_local_index(self) -> bool:
+        if self.backend == "local":
+            return True
+        if self.backend != "auto" or not self.local_index.exists():
+            return False
+
+        # The copy is per host, only search it while it is the generation the
+        # last ingest published, whichever host ran it
+        if self.local_index.generation() == self._published_generation():
+            return True
+
+        self.local_index.delete()
+        return False
+
+    def _generation_key(self) -> str:
+        return f"local_index:{self.index_name}:{self.namespace}"
+
+    def _published_generation(self) -> Optional[str]:
+        try:
+            generation = get_redis().get(self._generation_key())
+        except Exception as e:
+            logger_set.error(f"Reading local index generation failed : {e}")
+            return None
+
+        return generation.decode("utf-8") if generation is not None else None
+
+    def _publish_generation(self, generation: Optional[str]) -> None:
+        try:
+            if generation:
+                get_redis().set(self._generation_key(), generation)
+            else:
+                get_redis().delete(self._generation_key())
+        except Exception as e:
+            logger_set.error(f"Publishing local index generation failed : {e}")
+
+    @classmethod
+    def _get_client(cls, api_key: str) -> Pinecone:
+        client = cls._clients.get(api_key)
+        if client is None:
+            with cls._lock:
+                client = cls._clients.get(api_key)
+                if client is None:
+                    client = Pinecone(api_key=api_key)
+                    cls._clients[api_key] = client
+
+        return client
+
+    def _get_index(self, skip_index_check: bool = False):
+        """
+        Return the shared index handle, checking (and creating) the index only
+        the first time it is used in the process unless skip_index_check is set.
+        """
+        key = (self.api_key, self.index_name)
+        index = self._indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    if not skip_index_check:
+                        self._create_index_if_not_exist()
+                    index = self.pc.Index(self.index_name)
+                    self._indexes[key] = index
+
+        return index
+
     def _create_index_if_not_exist(self) -> None:
         """Create a new index if it doesn't exist."""
         try:
@@ -83,8 +200,7 @@ class PineConeConfig:
             time.sleep(1)
             retries += 1
 
-    def add_documents(self) -> None:
-        """Add documents from file to the vector store."""
+    def _validate_file(self) -> None:
         if not self.url:
             raise ValueError("File path not provided")
 
@@ -93,13 +209,239 @@ class PineConeConfig:
 
         if self.url_file_type not in self.SUPPORTED_FILE_TYPES:
             raise ValueError(
-                f"Unsupported file type. Supported types: {self.SUPPORTED_FILE_TYPES}"
+                f"Unsupported file type. Supported types: {supported_file_types()}"
             )
 
-        docs = self.load_and_split_document()
-        self.vector_store.add_documents(
-            documents=docs, ids=[f"{self.namespace}_{i}" for i in range(len(docs))]
-        )
+    def add_documents(
+        self, progress_callback: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """
+        Add documents from file to the vector store.
+
+        The file is loaded lazily and chunked incrementally, chunks are embedded
+        and upserted in batches of Config.INGEST_BATCH_SIZE with at most
+        Config.INGEST_CONCURRENCY batches in flight, so memory stays bounded by
+        the batches in flight rather than the file size.
+
+        Args:
+            progress_callback (callable, optional): Called with the number of
+                chunks indexed so far after every finished batch.
+
+        Returns:
+            int: The number of chunks indexed.
+        """
+        self._validate_file()
+
+        try:
+            if self.backend == "local":
+                return self._build_local_index(
+                    self._numbered_chunks(), progress_callback
+                )
+
+            indexed = self._upsert_chunks(self._numbered_chunks(), progress_callback)
+            self._refresh_local_index(indexed, self._numbered_chunks)
+            return indexed
+        finally:
+            retrieval_cache.invalidate(self.namespace)
+
+    def sync_documents(
+        self, progress_callback: Optional[Callable[[int], None]] = None
+    ) -> dict:
+        """
+        Incrementally re-index the file into the (stable) namespace.
+
+        Chunk ids are derived from a hash of the chunk content and its
+        CHUNK_ID_METADATA, positional metadata does not change them.
+        Chunks whose id is already in the namespace manifest are skipped, new or
+        changed chunks are embedded and upserted, and ids that are no longer
+        produced by the file are deleted.
+
+        Returns:
+            dict: The number of added, removed and unchanged chunks.
+        """
+        self._validate_file()
+
+        if self.backend == "local":
+            previous_ids = set(self.local_index.ids())
+        else:
+            previous_ids = set(self._load_manifest())
+        current_ids = []
+
+        def new_chunks() -> Iterator[tuple[str, Document]]:
+            for id, chunk in self._hashed_chunks():
+                current_ids.append(id)
+                if id not in previous_ids:
+                    yield id, chunk
+
+        try:
+            if self.backend == "local":
+                # Unchanged chunks are served by the embedding cache
+                self._build_local_index(self._hashed_chunks(), progress_callback)
+                current_ids = self.local_index.ids()
+                added = len(set(current_ids).difference(previous_ids))
+                removed_ids = previous_ids.difference(current_ids)
+            else:
+                added = self._upsert_chunks(new_chunks(), progress_callback)
+
+                removed_ids = list(previous_ids.difference(current_ids))
+                for start in range(0, len(removed_ids), 1000):
+                    self.index.delete(
+                        ids=removed_ids[start : start + 1000], namespace=self.namespace
+                    )
+
+                self._save_manifest(current_ids)
+                self._refresh_local_index(len(current_ids), self._hashed_chunks)
+        finally:
+            retrieval_cache.invalidate(self.namespace)
+
+        return {
+            "added": added,
+            "removed": len(removed_ids),
+            "unchanged": len(current_ids) - added,
+        }
+
+    def _numbered_chunks(self) -> Iterator[tuple[str, Document]]:
+        for i, chunk in enumerate(self.iter_chunks()):
+            yield f"{self.namespace}_{i}", chunk
+
+    def _hashed_chunks(self) -> Iterator[tuple[str, Document]]:
+        occurrences = {}
+        for chunk in self.iter_chunks():
+            yield self._chunk_id(chunk, occurrences), chunk
+
+    def _chunk_id(self, chunk: Document, occurrences: dict) -> str:
+        metadata = {
+            key: chunk.metadata[key]
+            for key in self.CHUNK_ID_METADATA
+            if key in chunk.metadata
+        }
+        payload = json.dumps([chunk.page_content, metadata], sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+        # Identical chunks in one file get distinct ids
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        suffix = f"-{occurrence}" if occurrence else ""
+
+        return f"{self.namespace}_{digest}{suffix}"
+
+    def _refresh_local_index(
+        self, count: int, chunks: Callable[[], Iterator[tuple[str, Document]]]
+    ) -> None:
+        """
+        Mirror a namespace small enough into the local index (auto backend),
+        or drop a stale local copy of a namespace that outgrew it.
+        """
+        if self.backend != "auto":
+            return
+
+        try:
+            if count <= Config.LOCAL_INDEX_MAX_CHUNKS:
+                self._build_local_index(chunks())
+                self._publish_generation(self.local_index.generation())
+            else:
+                self._publish_generation(None)
+                self.local_index.delete()
+        except Exception as e:
+            # Searches fall back to Pinecone
+            self._publish_generation(None)
+            self.local_index.delete()
+            logger_set.error(f"Building local index of {self.namespace} failed : {e}")
+
+    def _build_local_index(
+        self,
+        chunks: Iterator[tuple[str, Document]],
+        progress_callback: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        ids, texts, metadatas, vectors = [], [], [], []
+        for batch in self._iter_batches(chunks, Config.INGEST_BATCH_SIZE):
+            batch_texts = [chunk.page_content for _, chunk in batch]
+            vectors.extend(embeddings.embed_documents(batch_texts))
+            ids.extend(id for id, _ in batch)
+            texts.extend(batch_texts)
+            metadatas.extend(chunk.metadata for _, chunk in batch)
+            if progress_callback:
+                progress_callback(len(ids))
+
+        self.local_index.build(ids, texts, metadatas, vectors)
+        return len(ids)
+
+    def _manifest_key(self) -> str:
+        return f"ingest:manifest:{self.index_name}:{self.namespace}"
+
+    def _load_manifest(self) -> List[str]:
+        """
+        Chunk ids currently stored in the namespace. Read from Redis, falling
+        back to listing the namespace in Pinecone when no manifest is stored.
+        """
+        try:
+            manifest = get_redis().get(self._manifest_key())
+            if manifest is not None:
+                return json.loads(manifest)
+        except Exception as e:
+            logger_set.error(f"Reading ingest manifest failed : {e}")
+
+        try:
+            ids = []
+            for page in self.index.list(
+                prefix=f"{self.namespace}_", namespace=self.namespace
+            ):
+                ids.extend(page)
+            return ids
+        except Exception as e:
+            logger_set.error(f"Listing namespace {self.namespace} failed : {e}")
+            return []
+
+    def _save_manifest(self, ids: List[str]) -> None:
+        try:
+            get_redis().set(self._manifest_key(), json.dumps(ids))
+        except Exception as e:
+            logger_set.error(f"Saving ingest manifest failed : {e}")
+
+    def _upsert_chunks(
+        self,
+        chunks: Iterator[tuple[str, Document]],
+        progress_callback: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """Embed and upsert (id, chunk) pairs in bounded parallel batches."""
+        indexed = 0
+        concurrency = Config.INGEST_CONCURRENCY
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="ingest"
+        ) as executor:
+            in_flight = set()
+            for batch in self._iter_batches(chunks, Config.INGEST_BATCH_SIZE):
+                in_flight.add(executor.submit(self._add_batch, batch))
+                if len(in_flight) >= concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    indexed += sum(future.result() for future in done)
+                    if progress_callback:
+                        progress_callback(indexed)
+
+            for future in as_completed(in_flight):
+                indexed += future.result()
+                if progress_callback:
+                    progress_callback(indexed)
+
+        return indexed
+
+    def _add_batch(self, batch: List[tuple[str, Document]]) -> int:
+        ids, documents = zip(*batch)
+        self.vector_store.add_documents(documents=list(documents), ids=list(ids))
+        return len(batch)
+
+    @staticmethod
+    def _iter_batches(
+        items: Iterator[tuple[str, Document]], batch_size: int
+    ) -> Iterator[List[tuple[str, Document]]]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
 
     # def add_text(self) -> None:
     #     """Add text data to the vector store."""
@@ -114,22 +456,25 @@ class PineConeConfig:
 
     def load_and_split_document(self) -> List[Document]:
         """Load and split document based on file type."""
+        return list(self.iter_chunks())
 
-        loaders = {
-            "csv": CSVLoader,
-            "pdf": PyPDFLoader,
-            "txt": TextLoader,
-        }
-
-        loader_class = loaders.get(self.url_file_type)
-        if not loader_class:
-            raise ValueError(f"Unsupported file type: {self.url_file_type}")
+    def iter_documents(self) -> Iterator[Document]:
+        """
+        Lazily load the file with the loader registered for its type, e.g. by
+        page (pdf), row (csv), record (json, jsonl) or section (md).
+        """
+        loader = get_loader(self.url, self.url_file_type)
 
         try:
-            return loader_class(self.url).load_and_split(splitter)
+            yield from loader.lazy_load()
         except Exception as e:
             raise RuntimeError(f"Error loading document: {str(e)}")
 
+    def iter_chunks(self) -> Iterator[Document]:
+        """Split the lazily loaded documents into chunks one document at a time."""
+        for document in self.iter_documents():
+            yield from splitter.split_documents([document])
+
     # def get_text_chunks_langchain(self) -> List[Document]:
     #     """Convert text data into document chunks."""
     #     if not self.data:
@@ -150,16 +495,33 @@ class PineConeConfig:
         score_threshold: Optional[float] = None,
         filter: Optional[dict] = None,
         include_metadata: bool = True,
+        use_cache: bool = True,
+        mode: Optional[str] = None,
+        fetch_k: Optional[int] = None,
+        alpha: Optional[float] = None,
+        use_mmr: Optional[bool] = None,
     ) -> List[Union[Document, tuple[Document, float]]]:
         """
         Perform similarity search across all documents in the namespace.
 
+        In "hybrid" mode fetch_k candidates are fetched from Pinecone and
+        reranked locally by fusing their vector score with a BM25 score over
+        the stemmed, stopword free query terms, optionally diversified with
+        maximal marginal relevance.
+
         Args:
             query (str): The search query
             k (int): Number of results to return
             score_threshold (float, optional): Minimum similarity score threshold
             filter (dict, optional): Metadata filter conditions
             include_metadata (bool): Whether to include metadata in results
+            use_cache (bool): Serve repeated searches from the retrieval cache
+            mode (str, optional): "vector" or "hybrid", defaults to
+                Config.RETRIEVAL_MODE
+            fetch_k (int, optional): Candidates to rerank in hybrid mode
+            alpha (float, optional): Weight of the vector score in hybrid mode,
+                1 - alpha weights the BM25 score
+            use_mmr (bool, optional): Select the hybrid results with MMR
 
         Returns:
             List[Union[Document, tuple[Document, float]]]: List of documents or
@@ -168,6 +530,67 @@ class PineConeConfig:
         if not query:
             raise ValueError("Query string is required")
 
+        mode = mode or Config.RETRIEVAL_MODE
+        if mode not in self.RETRIEVAL_MODES:
+            raise ValueError(
+                f"Unsupported retrieval mode: {mode}. Supported modes: {self.RETRIEVAL_MODES}"
+            )
+
+        options = {"mode": mode}
+        if mode == "hybrid":
+            options.update(
+                fetch_k=max(fetch_k or Config.RETRIEVAL_FETCH_K, k),
+                alpha=Config.RETRIEVAL_HYBRID_ALPHA if alpha is None else alpha,
+                use_mmr=Config.RETRIEVAL_MMR if use_mmr is None else use_mmr,
+            )
+
+        use_cache = use_cache and retrieval_cache.enabled
+        if use_cache:
+            cache_key = retrieval_cache.make_key(
+                query, k, score_threshold, filter, options
+            )
+            cached = retrieval_cache.get(self.namespace, cache_key)
+            if cached is not None:
+                return cached
+
+        if mode == "hybrid":
+            results = self._hybrid_search(
+                query=query,
+                k=k,
+                score_threshold=score_threshold,
+                filter=filter,
+                fetch_k=options["fetch_k"],
+                alpha=options["alpha"],
+                use_mmr=options["use_mmr"],
+            )
+        else:
+            results = self._similarity_search(
+                query=query,
+                k=k,
+                score_threshold=score_threshold,
+                filter=filter,
+                include_metadata=include_metadata,
+            )
+        if use_cache:
+            retrieval_cache.set(self.namespace, cache_key, results)
+
+        return results
+
+    def _similarity_search(
+        self,
+        query: str,
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[dict],
+        include_metadata: bool,
+    ) -> List[str]:
+        if self._use_local_index():
+            return [
+                match["text"]
+                for match in self._query_matches(query, k, filter)
+                if score_threshold is None or match["score"] >= score_threshold
+            ]
+
         try:
             # If score threshold is provided, use similarity search with score
             if score_threshold is not None:
@@ -194,6 +617,81 @@ class PineConeConfig:
         except Exception as e:
             raise RuntimeError(f"Error performing similarity search: {str(e)}")
 
+    def _hybrid_search(
+        self,
+        query: str,
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[dict],
+        fetch_k: int,
+        alpha: float,
+        use_mmr: bool,
+    ) -> List[str]:
+        matches = self._query_matches(query, fetch_k, filter, include_values=use_mmr)
+        if not matches:
+            return []
+
+        texts = [match["text"] for match in matches]
+        ranked = hybrid_rerank(
+            query_terms=analyze(query),
+            documents_terms=[analyze(text) for text in texts],
+            vector_scores=[match["score"] for match in matches],
+            k=len(matches) if score_threshold is not None else k,
+            alpha=alpha,
+            k1=Config.RETRIEVAL_BM25_K1,
+            b=Config.RETRIEVAL_BM25_B,
+            vectors=[match["values"] for match in matches] if use_mmr else None,
+            mmr_lambda=Config.RETRIEVAL_MMR_LAMBDA,
+        )
+
+        # The threshold applies to the vector score, exact term matches are
+        # kept regardless so keyword queries are not filtered out
+        if score_threshold is not None:
+            ranked = [
+                (index, fused, keyword)
+                for index, fused, keyword in ranked
+                if keyword > 0 or matches[index]["score"] >= score_threshold
+            ][:k]
+
+        return [texts[index] for index, _, _ in ranked]
+
+    def _query_matches(
+        self,
+        query: str,
+        top_k: int,
+        filter: Optional[dict],
+        include_values: bool = False,
+    ) -> List[dict]:
+        """
+        The top_k chunks closest to the query from the local index or Pinecone,
+        as dicts with text, score and, if asked, values.
+        """
+        try:
+            vector = embeddings.embed_query(query)
+            if self._use_local_index():
+                return self.local_index.search(vector, top_k, filter, include_values)
+
+            response = self.index.query(
+                vector=vector,
+                top_k=top_k,
+                namespace=self.namespace,
+                filter=filter,
+                include_metadata=True,
+                include_values=include_values,
+            )
+        except Exception as e:
+            raise RuntimeError(f"Error performing similarity search: {str(e)}")
+
+        return [
+            {
+                "text": match.metadata[self.TEXT_KEY],
+                "score": match.score,
+                "values": match.values,
+            }
+            for match in response.matches
+            if match.metadata and match.metadata.get(self.TEXT_KEY)
+        ]
+
     def get_namespace_stats(self) -> dict:
         """Get statistics for the current namespace."""
         try:
@@ -203,7 +701,16 @@ class PineConeConfig:
 
     def delete_namespace(self) -> None:
         """Delete all vectors in the current namespace."""
+        self.local_index.delete()
+        if self.backend == "auto":
+            self._publish_generation(None)
+        if self.backend != "local":
+            try:
+                self.index.delete(delete_all=True, namespace=self.namespace)
+            except Exception as e:
+                raise RuntimeError(f"Error deleting namespace: {str(e)}")
+        retrieval_cache.invalidate(self.namespace)
         try:
-            self.index.delete(delete_all=True, namespace=self.namespace)
+            get_redis().delete(self._manifest_key())
         except Exception as e:
-            raise RuntimeError(f"Error deleting namespace: {str(e)}")
+            logger_set.error(f"Deleting ingest manifest failed : {e}")
@@ -0,0 +1,114 @@
+from collections import Counter
+from typing import Optional, Sequence
+import numpy as np
+
+
+def bm25_scores(
+    query_terms: Sequence[str],
+    documents_terms: Sequence[Sequence[str]],
+    k1: float = 1.5,
+    b: float = 0.75,
+) -> np.ndarray:
+    """
+    Okapi BM25 score of every document for the query. Document frequencies
+    and the average length are taken over the given documents, i.e. the
+    candidate set, so no corpus wide statistics are needed.
+    """
+    terms = list(dict.fromkeys(query_terms))
+    if not terms or not documents_terms:
+        return np.zeros(len(documents_terms))
+
+    columns = {term: column for column, term in enumerate(terms)}
+    tf = np.zeros((len(documents_terms), len(terms)))
+    for row, document_terms in enumerate(documents_terms):
+        for term, count in Counter(document_terms).items():
+            column = columns.get(term)
+            if column is not None:
+                tf[row, column] = count
+
+    lengths = np.array([len(document) for document in documents_terms], dtype=float)
+    average_length = lengths.mean() or 1.0
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(documents_terms) - df + 0.5) / (df + 0.5))
+    length_norm = k1 * (1 - b + b * lengths / average_length)
+
+    return (tf * (k1 + 1) / (tf + length_norm[:, None]) * idf).sum(axis=1)
+
+
+def min_max_normalize(scores: np.ndarray) -> np.ndarray:
+    if not len(scores):
+        return scores
+
+    low, high = scores.min(), scores.max()
+    if high == low:
+        return np.ones_like(scores) if high > 0 else np.zeros_like(scores)
+
+    return (scores - low) / (high - low)
+
+
+def fuse_scores(
+    vector_scores: np.ndarray, keyword_scores: np.ndarray, alpha: float
+) -> np.ndarray:
+    """Weighted sum of the min-max normalized scores, alpha weights vectors."""
+    return alpha * min_max_normalize(vector_scores) + (1 - alpha) * min_max_normalize(
+        keyword_scores
+    )
+
+
+def mmr(
+    relevance: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float = 0.5
+) -> list[int]:
+    """
+    Maximal marginal relevance selection. Greedily picks the candidate with
+    the best trade-off between relevance and cosine similarity to the
+    candidates already picked, returning their indices in pick order.
+    """
+    vectors = np.asarray(vectors, dtype=float)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    unit = vectors / norms
+    similarity = unit @ unit.T
+
+    selected = []
+    remaining = list(range(len(relevance)))
+    max_similarity = np.zeros(len(relevance))
+    while remaining and len(selected) < k:
+        scores = (
+            lambda_mult * relevance[remaining]
+            - (1 - lambda_mult) * max_similarity[remaining]
+        )
+        best = remaining.pop(int(np.argmax(scores)))
+        selected.append(best)
+        max_similarity = np.maximum(max_similarity, similarity[best])
+
+    return selected
+
+
+def hybrid_rerank(
+    query_terms: Sequence[str],
+    documents_terms: Sequence[Sequence[str]],
+    vector_scores: Sequence[float],
+    k: int,
+    alpha: float = 0.5,
+    k1: float = 1.5,
+    b: float = 0.75,
+    vectors: Optional[np.ndarray] = None,
+    mmr_lambda: float = 0.5,
+) -> list[tuple[int, float, float]]:
+    """
+    Rerank candidates by fusing their vector scores with BM25 scores, then
+    optionally diversify the top k with MMR when candidate vectors are given.
+
+    Returns:
+        list[tuple[int, float, float]]: (candidate index, fused score, BM25
+        score) of the selected candidates, best first.
+    """
+    keyword_scores = bm25_scores(query_terms, documents_terms, k1=k1, b=b)
+    fused = fuse_scores(np.asarray(vector_scores, dtype=float), keyword_scores, alpha)
+
+    if vectors is not None:
+        order = mmr(fused, vectors, k, mmr_lambda)
+    else:
+        order = np.argsort(-fused, kind="stable")[:k].tolist()
+
+    return [(index, float(fused[index]), float(keyword_scores[index])) for index in order]
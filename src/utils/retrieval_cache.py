@@ -0,0 +1,97 @@
+import hashlib
+import json
+from typing import Optional
+from src.config import Config
+from src.utils.cache import TTLCache, get_redis
+from src.utils.logger import logger_set
+
+
+class RetrievalCache:
+    """
+    Cache of similarity search results keyed by
+    (namespace, query hash, k, score threshold, filter, retrieval options).
+
+    The "local" backend is an in-process LRU with TTL. The "redis" backend
+    keeps one hash per namespace so every worker shares hits and an
+    invalidation is a single DEL; entries of a namespace expire ttl seconds
+    after its last write. With the local backend an invalidation only reaches
+    the current process, other processes rely on the TTL.
+    """
+
+    BACKENDS = {"local", "redis", "none"}
+
+    def __init__(
+        self,
+        backend: str = Config.RETRIEVAL_CACHE_BACKEND,
+        ttl: int = Config.RETRIEVAL_CACHE_TTL,
+        maxsize: int = Config.RETRIEVAL_CACHE_MAXSIZE,
+    ):
+        if backend not in self.BACKENDS:
+            raise ValueError(
+                f"Unsupported retrieval cache backend: {backend}. Supported backends: {self.BACKENDS}"
+            )
+
+        self.backend = backend
+        self.ttl = ttl
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend != "none"
+
+    @staticmethod
+    def make_key(
+        query: str,
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[dict],
+        options: Optional[dict] = None,
+    ) -> str:
+        payload = json.dumps(
+            [query, k, score_threshold, filter, options], sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _redis_key(namespace: str) -> str:
+        return f"retrieval:{namespace}"
+
+    def get(self, namespace: str, key: str) -> Optional[list[str]]:
+        if self.backend == "local":
+            return self._local.get((namespace, key))
+
+        if self.backend == "redis":
+            try:
+                value = get_redis().hget(self._redis_key(namespace), key)
+                return json.loads(value) if value is not None else None
+            except Exception as e:
+                logger_set.error(f"Retrieval cache read failed : {e}")
+
+        return None
+
+    def set(self, namespace: str, key: str, results: list[str]) -> None:
+        if self.backend == "local":
+            self._local.set((namespace, key), results)
+
+        elif self.backend == "redis":
+            try:
+                redis_key = self._redis_key(namespace)
+                pipeline = get_redis().pipeline()
+                pipeline.hset(redis_key, key, json.dumps(results))
+                pipeline.expire(redis_key, self.ttl)
+                pipeline.execute()
+            except Exception as e:
+                logger_set.error(f"Retrieval cache write failed : {e}")
+
+    def invalidate(self, namespace: str) -> None:
+        """Drop every cached result of namespace, e.g. after re-embedding it."""
+        self._local.delete_matching(lambda key: key[0] == namespace)
+
+        if self.backend == "redis":
+            try:
+                get_redis().delete(self._redis_key(namespace))
+            except Exception as e:
+                logger_set.error(f"Retrieval cache invalidation failed : {e}")
+
+
+retrieval_cache = RetrievalCache()
@@ -0,0 +1,29 @@
+from functools import lru_cache
+import tiktoken
+from src.config import Config
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str = Config.MODEL_NAME) -> tiktoken.Encoding:
+    """Tokenizer of model, falling back to cl100k_base for unknown models."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except (KeyError, TypeError):
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = Config.MODEL_NAME) -> int:
+    if not text:
+        return 0
+
+    return len(get_encoding(model).encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = Config.MODEL_NAME) -> str:
+    """Cut text down to at most max_tokens tokens."""
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+
+    return encoding.decode(tokens[:max_tokens])
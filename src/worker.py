@@ -0,0 +1,32 @@
+"""
+Start a Celery worker for one of the profiles of src.celeryconfig.
+
+    python -m src.worker agents [extra celery worker options]
+"""
+import sys
+from typing import Optional
+from src.celery import celery_app
+from src.celeryconfig import WORKER_PROFILES
+
+
+def worker_argv(profile: str, extra: Optional[list[str]] = None) -> list[str]:
+    if profile not in WORKER_PROFILES:
+        raise ValueError(
+            f"Unknown worker profile: {profile}. Supported profiles: {list(WORKER_PROFILES)}"
+        )
+
+    settings = WORKER_PROFILES[profile]
+    return [
+        "worker",
+        f"--queues={','.join(settings['queues'])}",
+        f"--pool={settings['pool']}",
+        f"--concurrency={settings['concurrency']}",
+        f"--hostname={profile}@%h",
+        "--loglevel=info",
+        *(extra or []),
+    ]
+
+
+if __name__ == "__main__":
+    profile = sys.argv[1] if len(sys.argv) > 1 else "all"
+    celery_app.worker_main(worker_argv(profile, sys.argv[2:]))
@@ -0,0 +1,14 @@
+import os
+
+# Settings read at import time by src.config, the tests never reach these services
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+import fakeredis
+import pytest
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError
+import pytest
+from src.task.executor import AgentExecutor
+
+
+def run_in_thread(executor, coro, **kwargs):
+    """Run coro like a Celery thread would, collecting its result or error."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = executor.run(coro, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+async def answer(value):
+    return value
+
+
+@pytest.fixture
+def kickoff_done():
+    """Unblocks the fake kickoff threads, also when a test fails."""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def test_run_returns_the_result():
+    executor = AgentExecutor(max_concurrency=2, timeout=1)
+
+    assert executor.run(answer(42), key=1) == 42
+    assert executor.running == 0
+
+
+def test_timeout_raises():
+    executor = AgentExecutor(max_concurrency=2, timeout=0.05)
+
+    with pytest.raises(TimeoutError):
+        executor.run(asyncio.sleep(1))
+
+
+def test_timed_out_kickoff_keeps_its_slot_until_its_thread_returns(kickoff_done):
+    executor = AgentExecutor(max_concurrency=1, timeout=5)
+
+    # Like crewAI kickoff_async, a blocking call handed to the default executor
+    with pytest.raises(TimeoutError):
+        executor.run(asyncio.to_thread(kickoff_done.wait), timeout=0.05)
+
+    thread, outcome = run_in_thread(executor, answer("next"), timeout=0.2)
+    # Waits for the slot, its own timeout only starts once it got it
+    time.sleep(0.4)
+    assert outcome == {}
+
+    kickoff_done.set()
+    thread.join(timeout=2)
+    assert outcome == {"result": "next"}
+
+
+def test_cancel():
+    executor = AgentExecutor(max_concurrency=2, timeout=5)
+    thread, outcome = run_in_thread(executor, asyncio.sleep(5), key="task-1")
+    wait_until(lambda: executor.running == 1)
+
+    assert executor.cancel("task-1") is True
+    thread.join(timeout=2)
+
+    assert isinstance(outcome["error"], CancelledError)
+    assert executor.running == 0
+    assert executor.cancel("task-1") is False
+
+
+def test_cancelled_kickoff_keeps_its_slot_until_its_thread_returns(kickoff_done):
+    executor = AgentExecutor(max_concurrency=1, timeout=5)
+    kickoff_started = threading.Event()
+
+    def kickoff():
+        kickoff_started.set()
+        kickoff_done.wait()
+
+    thread, outcome = run_in_thread(executor, asyncio.to_thread(kickoff), key=1)
+    kickoff_started.wait(timeout=2)
+    executor.cancel(1)
+    thread.join(timeout=2)
+    assert isinstance(outcome["error"], CancelledError)
+
+    thread, outcome = run_in_thread(executor, answer("next"))
+    time.sleep(0.2)
+    assert outcome == {}
+
+    kickoff_done.set()
+    thread.join(timeout=2)
+    assert outcome == {"result": "next"}
@@ -0,0 +1,156 @@
+import os
+import threading
+from unittest import mock
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from src.task import controllers
+from src.task.controllers import TaskCompletedController
+from src.task.models import CompletedTaskDetails
+
+
+def make_rows(task_ids, from_user=1):
+    return [
+        {"task_id": task_id, "from_user": from_user, "to_user": 2, "from_user_role_id": 3}
+        for task_id in task_ids
+    ]
+
+
+def make_session(dialect="mysql", lock_mode=1, lastrowid=41):
+    db = mock.MagicMock()
+    db.get_bind.return_value.dialect.name = dialect
+
+    def execute(statement, *args, **kwargs):
+        result = mock.MagicMock()
+        if "innodb_autoinc_lock_mode" in str(statement):
+            result.scalar.return_value = lock_mode
+        else:
+            result.lastrowid = lastrowid
+        return result
+
+    db.execute.side_effect = execute
+
+    def flush():
+        # Row by row inserts, ids as MySQL would assign them
+        for offset, completed_task in enumerate(db.add_all.call_args.args[0]):
+            completed_task.id = 100 + offset * 7
+
+    db.flush.side_effect = flush
+    return db
+
+
+@pytest.fixture(autouse=True)
+def reset_lock_mode(monkeypatch):
+    monkeypatch.setattr(controllers, "_autoinc_lock_mode", None)
+
+
+@pytest.mark.parametrize("lock_mode", [0, 1])
+def test_multi_row_insert_reads_ids_from_lastrowid(lock_mode):
+    db = make_session(lock_mode=lock_mode, lastrowid=41)
+
+    ids = TaskCompletedController.insert_completed_tasks(db, make_rows([5, 6, 7]))
+
+    assert ids == [41, 42, 43]
+    db.add_all.assert_not_called()
+    db.commit.assert_called_once()
+    # One lock mode query and one INSERT
+    assert db.execute.call_count == 2
+
+
+def test_interleaved_lock_mode_inserts_row_by_row():
+    db = make_session(lock_mode=2)
+
+    ids = TaskCompletedController.insert_completed_tasks(db, make_rows([5, 6, 7]))
+
+    assert ids == [100, 107, 114]
+    completed_tasks = db.add_all.call_args.args[0]
+    assert [completed_task.task_id for completed_task in completed_tasks] == [5, 6, 7]
+    assert all(completed_task.status == 0 for completed_task in completed_tasks)
+    db.commit.assert_called_once()
+
+
+def test_other_dialects_insert_row_by_row():
+    db = make_session(dialect="sqlite")
+
+    ids = TaskCompletedController.insert_completed_tasks(db, make_rows([5]))
+
+    assert ids == [100]
+    db.execute.assert_not_called()
+
+
+def test_lock_mode_is_read_once_per_process():
+    TaskCompletedController.insert_completed_tasks(make_session(), make_rows([5]))
+    db = make_session()
+
+    TaskCompletedController.insert_completed_tasks(db, make_rows([6]))
+
+    assert db.execute.call_count == 1
+
+
+def test_no_rows_touch_nothing():
+    db = make_session()
+
+    assert TaskCompletedController.insert_completed_tasks(db, []) == []
+    db.execute.assert_not_called()
+    db.commit.assert_not_called()
+
+
+def test_create_completed_tasks_maps_task_ids_to_ids():
+    db = make_session(lastrowid=10)
+
+    ids = TaskCompletedController.create_completed_tasks(
+        db, task_ids=[8, 9], from_user=1, to_user=2, from_user_role_id=3
+    )
+
+    assert ids == {8: 10, 9: 11}
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_DATABASE_URL"),
+    reason="TEST_DATABASE_URL (a scratch MySQL database) is not set",
+)
+def test_concurrent_bulk_inserts_get_their_own_ids():
+    """
+    Against a real MySQL server, under its configured innodb_autoinc_lock_mode:
+    every id returned by concurrent bulk inserts belongs to a row of that
+    insert, whichever path was taken.
+    """
+    engine = create_engine(os.environ["TEST_DATABASE_URL"])
+    table = CompletedTaskDetails.__table__
+    created = not inspect(engine).has_table(table.name)
+    if created:
+        table.create(engine)
+    Session = sessionmaker(bind=engine)
+    results = {}
+
+    def insert(worker: int) -> None:
+        task_ids = list(range(worker * 1000, worker * 1000 + 200))
+        with Session() as db:
+            results[worker] = (
+                task_ids,
+                TaskCompletedController.insert_completed_tasks(
+                    db, make_rows(task_ids, from_user=worker)
+                ),
+            )
+
+    try:
+        threads = [threading.Thread(target=insert, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with Session() as db:
+            for worker, (task_ids, ids) in results.items():
+                rows = {
+                    row.id: row
+                    for row in db.query(CompletedTaskDetails).filter(
+                        CompletedTaskDetails.id.in_(ids)
+                    )
+                }
+                assert [rows[id].task_id for id in ids] == task_ids
+                assert all(rows[id].from_user == worker for id in ids)
+    finally:
+        if created:
+            table.drop(engine)
+        engine.dispose()
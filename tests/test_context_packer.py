@@ -0,0 +1,128 @@
+import pytest
+from src.crew import context
+from src.crew.context import ContextPacker
+
+
+def count_tokens(text: str, model: str = None) -> int:
+    return len(text.split())
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = None) -> str:
+    return " ".join(text.split()[:max_tokens])
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    # One token per word keeps the budget arithmetic exact and offline
+    monkeypatch.setattr(context, "count_tokens", count_tokens)
+    monkeypatch.setattr(context, "truncate_tokens", truncate_tokens)
+
+
+def words(word: str, count: int) -> str:
+    return " ".join([word] * count)
+
+
+def make_packer(**kwargs) -> ContextPacker:
+    settings = {
+        "budget": 1000,
+        "field_max_tokens": 100,
+        "previous_output_max_tokens": 100,
+        "model": "gpt-4o-mini",
+    }
+    return ContextPacker(**{**settings, **kwargs})
+
+
+def test_fields_are_capped_and_always_kept():
+    packer = make_packer(budget=50, field_max_tokens=20)
+
+    packed = packer.pack("", {"role": words("analyst", 200), "goal": None})
+
+    role = packed["fields"]["role"]
+    assert role.endswith(ContextPacker.TRUNCATED)
+    assert count_tokens(role, packer.model) <= 20
+    assert packed["fields"]["goal"] == ""
+
+
+def test_packed_sections_stay_within_budget():
+    packer = make_packer(budget=400)
+    reserved = words("instructions", 50)
+
+    packed = packer.pack(
+        reserved,
+        {"role": words("analyst", 30)},
+        previous_output=[words("older", 300), words("newer", 300)],
+        doc_context=[words("chunk", 300), words("other", 300)],
+    )
+
+    sections = [
+        reserved,
+        *packed["fields"].values(),
+        *packed["previous_output"],
+        *packed["doc_context"],
+    ]
+    assert packed["tokens"] == sum(count_tokens(text, packer.model) for text in sections)
+    assert packed["tokens"] <= packer.budget
+    assert packed["dropped"] > 0
+
+
+def test_newest_previous_output_is_kept_whole_and_older_ones_capped():
+    packer = make_packer(budget=1000, previous_output_max_tokens=50)
+    newest = words("newest", 300)
+
+    packed = packer.pack("", {}, previous_output=[words("older", 300), newest])
+
+    older, kept_newest = packed["previous_output"]
+    assert kept_newest == newest
+    assert older.endswith(ContextPacker.TRUNCATED)
+    assert count_tokens(older, packer.model) <= 50
+
+
+def test_newest_previous_output_wins_a_tight_budget():
+    packer = make_packer(budget=120, previous_output_max_tokens=500)
+
+    packed = packer.pack(
+        "", {}, previous_output=[words("older", 100), words("newest", 100)]
+    )
+
+    # The older output does not fit in the remaining 20 tokens
+    assert packed["previous_output"] == [words("newest", 100)]
+    assert packed["dropped"] == 1
+
+
+def test_documents_fill_the_rest_in_rank_order():
+    packer = make_packer(budget=160)
+
+    packed = packer.pack(
+        "",
+        {},
+        doc_context=[words("first", 100), words("second", 100), words("third", 100)],
+    )
+
+    first, second = packed["doc_context"]
+    assert first == words("first", 100)
+    assert second.startswith("second") and second.endswith(ContextPacker.TRUNCATED)
+    assert packed["dropped"] == 1
+
+
+def test_remainders_below_the_minimum_are_not_filled():
+    packer = make_packer(budget=100 + ContextPacker.MIN_SECTION_TOKENS - 1)
+
+    packed = packer.pack("", {}, doc_context=[words("first", 100), words("second", 100)])
+
+    assert packed["doc_context"] == [words("first", 100)]
+    assert packed["dropped"] == 1
+
+
+def test_duplicate_content_is_packed_once():
+    packer = make_packer()
+
+    packed = packer.pack(
+        "",
+        {},
+        previous_output=["The Quarterly   report"],
+        doc_context=["the quarterly report", "", "Another chunk"],
+    )
+
+    assert packed["previous_output"] == ["The Quarterly   report"]
+    assert packed["doc_context"] == ["Another chunk"]
+    assert packed["dropped"] == 2
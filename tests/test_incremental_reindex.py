@@ -0,0 +1,141 @@
+import pytest
+from langchain_core.documents.base import Document
+from src.utils import pinecone as pinecone_module
+from src.utils.pinecone import PineConeConfig
+
+
+class FakeIndex:
+    """Namespace of a Pinecone index: ids and the documents upserted under them."""
+
+    def __init__(self):
+        self.vectors = {}
+        self.deleted = []
+
+    def delete(self, ids, namespace):
+        self.deleted.extend(ids)
+        for id in ids:
+            self.vectors.pop(id, None)
+
+    def list(self, prefix, namespace):
+        yield [id for id in self.vectors if id.startswith(prefix)]
+
+
+class FakeVectorStore:
+    def __init__(self, index: FakeIndex):
+        self.index = index
+        self.upserted = []
+
+    def add_documents(self, documents, ids):
+        self.upserted.extend(ids)
+        self.index.vectors.update(zip(ids, documents))
+
+
+def rows(*texts):
+    """Chunks as a CSV loader yields them, with positional row metadata."""
+    return [
+        Document(page_content=text, metadata={"source": "doc.csv", "row": row})
+        for row, text in enumerate(texts)
+    ]
+
+
+@pytest.fixture
+def store(redis_client, monkeypatch):
+    monkeypatch.setattr(pinecone_module, "get_redis", lambda: redis_client)
+
+    config = PineConeConfig(
+        api_key="test",
+        index_name="test-index",
+        namespace="agent-doc",
+        url="doc.csv",
+        url_file_type="csv",
+        backend="pinecone",
+    )
+    index = FakeIndex()
+    # Pre-fill the cached properties, nothing reaches Pinecone
+    config.__dict__["index"] = index
+    config.__dict__["vector_store"] = FakeVectorStore(index)
+    config.chunks = []
+    config.iter_chunks = lambda: iter(config.chunks)
+    return config
+
+
+def sync(store, chunks):
+    store.chunks = chunks
+    store.vector_store.upserted.clear()
+    store.index.deleted.clear()
+    return store.sync_documents()
+
+
+def test_first_sync_adds_every_chunk(store):
+    result = sync(store, rows("alpha", "beta", "gamma"))
+
+    assert result == {"added": 3, "removed": 0, "unchanged": 0}
+    assert len(store.index.vectors) == 3
+    assert all(id.startswith("agent-doc_") for id in store.index.vectors)
+
+
+def test_unchanged_file_embeds_nothing(store):
+    sync(store, rows("alpha", "beta", "gamma"))
+
+    result = sync(store, rows("alpha", "beta", "gamma"))
+
+    assert result == {"added": 0, "removed": 0, "unchanged": 3}
+    assert store.vector_store.upserted == []
+    assert store.index.deleted == []
+
+
+def test_inserted_row_only_adds_that_chunk(store):
+    sync(store, rows("alpha", "beta", "gamma"))
+    before = set(store.index.vectors)
+
+    # Every later row number shifts, their ids must not
+    result = sync(store, rows("new first row", "alpha", "beta", "gamma"))
+
+    assert result == {"added": 1, "removed": 0, "unchanged": 3}
+    assert len(store.vector_store.upserted) == 1
+    assert before < set(store.index.vectors)
+
+
+def test_removed_and_changed_chunks(store):
+    sync(store, rows("alpha", "beta", "gamma"))
+    ids = {document.page_content: id for id, document in store.index.vectors.items()}
+
+    result = sync(store, rows("alpha", "beta changed"))
+
+    assert result == {"added": 1, "removed": 2, "unchanged": 1}
+    assert sorted(store.index.deleted) == sorted([ids["beta"], ids["gamma"]])
+    assert sorted(document.page_content for document in store.index.vectors.values()) == [
+        "alpha",
+        "beta changed",
+    ]
+
+
+def test_duplicate_chunks_get_distinct_ids(store):
+    result = sync(store, rows("same", "same", "other"))
+
+    assert result == {"added": 3, "removed": 0, "unchanged": 0}
+    duplicates = sorted(
+        id for id, document in store.index.vectors.items() if document.page_content == "same"
+    )
+    assert len(duplicates) == 2
+    assert duplicates[1] == f"{duplicates[0]}-1"
+
+
+def test_non_positional_metadata_is_part_of_the_id(store):
+    sections = [
+        Document(page_content="Setup steps", metadata={"heading": "Install"}),
+        Document(page_content="Setup steps", metadata={"heading": "Upgrade"}),
+    ]
+
+    sync(store, sections)
+
+    assert not any(id.endswith("-1") for id in store.index.vectors)
+
+
+def test_manifest_falls_back_to_listing_the_namespace(store, redis_client):
+    sync(store, rows("alpha", "beta"))
+    redis_client.flushall()
+
+    result = sync(store, rows("alpha"))
+
+    assert result == {"added": 0, "removed": 1, "unchanged": 1}
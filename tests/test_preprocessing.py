@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+import pytest
+from src import preprocessing
+
+
+@pytest.fixture(autouse=True)
+def fresh_stop_words():
+    preprocessing.get_stop_words.cache_clear()
+    yield
+    preprocessing.get_stop_words.cache_clear()
+
+
+def test_analyze_drops_stopwords_and_stems(monkeypatch):
+    stopwords = SimpleNamespace(words=lambda language: ["the", "of"])
+    monkeypatch.setattr(preprocessing, "stopwords", stopwords)
+
+    assert preprocessing.analyze("The running of the Tests") == ["run", "test"]
+
+
+def test_missing_stopwords_corpus_keeps_every_token(monkeypatch):
+    def missing(language):
+        raise LookupError("Resource stopwords not found.")
+
+    monkeypatch.setattr(preprocessing, "stopwords", SimpleNamespace(words=missing))
+
+    assert preprocessing.get_stop_words() == frozenset()
+    assert preprocessing.analyze("the tests") == ["the", "test"]
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from src.task import workflow
+from src.task.workflow import WorkflowRun, build_task_graph, topological_levels
+
+
+def make_task(id, task_arrange, parent_task_id=None, prev_output_checkbox=None):
+    return SimpleNamespace(
+        id=id,
+        task_arrange=task_arrange,
+        parent_task_id=parent_task_id,
+        prev_output_checkbox=prev_output_checkbox,
+    )
+
+
+@pytest.fixture
+def run_redis(redis_client, monkeypatch):
+    monkeypatch.setattr(workflow, "get_redis", lambda: redis_client)
+    return redis_client
+
+
+def test_build_task_graph_dependencies():
+    tasks = [
+        make_task(1, 1),
+        make_task(2, 1),
+        make_task(3, 2, prev_output_checkbox="1"),
+        make_task(4, 2, parent_task_id=1),
+        make_task(5, 3, prev_output_checkbox="true"),
+        make_task(6, 3),
+    ]
+
+    assert build_task_graph(tasks) == {
+        1: [],
+        2: [],
+        # Every task of the closest lower arrange
+        3: [1, 2],
+        4: [1],
+        5: [3, 4],
+        # Neither a parent nor the checkbox, runs in parallel with the roots
+        6: [],
+    }
+
+
+def test_build_task_graph_ignores_unknown_and_self_parents():
+    tasks = [make_task(1, 1, parent_task_id=1), make_task(2, 2, parent_task_id=99)]
+
+    assert build_task_graph(tasks) == {1: [], 2: []}
+
+
+def test_topological_levels():
+    graph = {1: [], 2: [], 3: [1, 2], 4: [1], 5: [3, 4], 6: []}
+
+    assert topological_levels(graph) == [[1, 2, 6], [3, 4], [5]]
+
+
+def test_topological_levels_detects_cycles():
+    graph = {1: [], 2: [1, 3], 3: [2]}
+
+    with pytest.raises(HTTPException) as error:
+        topological_levels(graph)
+
+    assert error.value.status_code == 400
+
+
+def test_workflow_run_readies_dependents_once_all_dependencies_finished(run_redis):
+    run = WorkflowRun.start(
+        workflow_id=7,
+        graph={1: [], 2: [], 3: [1, 2], 4: [3]},
+        agent_ids={1: 10, 2: 20, 3: 30, 4: 40},
+        completed_task_ids={1: 100, 2: 200, 3: 300, 4: 400},
+    )
+
+    assert sorted(run.roots()) == [1, 2]
+    assert run.complete(1, "one") == []
+    assert run.complete(2, "two") == [3]
+    assert run.outputs(run.dependencies(3)) == ["one", "two"]
+    assert run.complete(3, "three") == [4]
+    assert WorkflowRun(run.run_id).completed_task_id(4) == 400
+
+
+def test_workflow_run_redelivered_complete_is_ignored(run_redis):
+    run = WorkflowRun.start(
+        workflow_id=7,
+        graph={1: [], 2: [], 3: [1, 2]},
+        agent_ids={1: 10, 2: 20, 3: 30},
+        completed_task_ids={1: 100, 2: 200, 3: 300},
+    )
+
+    assert run.complete(1, "one") == []
+    assert run.is_completed(1)
+    # A second delivery must not count as task 2 finishing
+    assert run.complete(1, "one again") == []
+    assert not run.is_completed(2)
+    assert run.outputs([1]) == ["one"]
+
+    assert run.complete(2, "two") == [3]
+    assert run.complete(2, "two") == []
+
+
+def test_workflow_run_downstream(run_redis):
+    run = WorkflowRun.start(
+        workflow_id=7,
+        graph={1: [], 2: [1], 3: [2], 4: []},
+        agent_ids={1: 10, 2: 20, 3: 30, 4: 40},
+        completed_task_ids={1: 100, 2: 200, 3: 300, 4: 400},
+    )
+
+    assert sorted(run.downstream(1)) == [2, 3]
+    assert run.downstream(4) == []